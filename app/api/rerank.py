@@ -2,17 +2,28 @@
 Rerank API endpoint for contextual candidate reranking.
 """
 
-from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi import APIRouter, HTTPException, Request, Depends, Response
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 from app.engine.reranker import rerank_candidates_with_metadata
 from app.api.errors import raise_http_error
 from app.logs import log_json
 from app.common.logging import timed
+from cachetools import TTLCache
+from hashlib import blake2b
+import threading
 import time
 
 router = APIRouter()
 
+# Responses for recently seen requests, keyed on a hash of the validated body.
+# Affinity decay is relative to the current time, so entries expire after a minute.
+_rerank_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_rerank_cache_lock = threading.Lock()
+
+# Health payload is constant, so it is encoded once and returned as-is
+_HEALTH_BYTES = b'{"status":"ok","endpoint":"rerank"}'
+
 
 class FeedbackEvent(BaseModel):
     """Individual feedback event model."""
@@ -129,6 +140,17 @@ def rerank_candidates_endpoint(req: RerankRequest, request: Request):
              n_candidates=len(req.candidates),
              n_feedback_events=len(req.audit_log.feedback_events))
     
+    cache_key = blake2b(req.model_dump_json().encode(), digest_size=16).digest()
+    with _rerank_cache_lock:
+        cached = _rerank_cache.get(cache_key)
+    if cached is not None:
+        log_json(request_id, "rerank_complete",
+                 duration_ms=round((time.time() - start_time) * 1000, 1),
+                 rerank_applied=cached.metadata.get("rerank_applied", False),
+                 n_candidates_with_reasons=cached.metadata.get("n_candidates_with_reasons", 0),
+                 cache_hit=True)
+        return cached
+    
     try:
         with timed("rerank"):
             # Convert Pydantic models to dictionaries
@@ -154,6 +176,8 @@ def rerank_candidates_endpoint(req: RerankRequest, request: Request):
                 reranked=reranked_response,
                 metadata=metadata
             )
+            with _rerank_cache_lock:
+                _rerank_cache[cache_key] = response
             
             duration = time.time() - start_time
             log_json(request_id, "rerank_complete",
@@ -171,4 +195,4 @@ def rerank_candidates_endpoint(req: RerankRequest, request: Request):
 @router.get("/rerank/health")
 def rerank_health():
     """Health check for rerank endpoint."""
-    return {"status": "ok", "endpoint": "rerank"}
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
@@ -0,0 +1,21 @@
+"""JSON response class shared by the app and routes that build responses by hand."""
+
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (FastAPI's own ORJSONResponse is deprecated)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+# orjson encodes the float-heavy itinerary payloads several times faster than stdlib json
+DefaultJSONResponse = ORJSONResponse if HAS_ORJSON else JSONResponse
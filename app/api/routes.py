@@ -10,6 +10,7 @@ from app.engine.rank import rank, collect_safety_warnings
 # from app.engine.schedule import schedule_days  # Replaced with pack_day + routes_verify
 from app.config import get_settings
 from app.api.errors import raise_http_error
+from app.api.responses import DefaultJSONResponse
 from app.logs import log_json, log_summary
 from app.common.logging import timed
 from app.engine.feedback import repack_day_from_actions
@@ -222,18 +223,25 @@ def build_itinerary(req: ItineraryRequest, request: Request, _: None = Depends(_
             
             # Stage 5: Budget optimization
             with timed("budget_optimize"):
-                # Create candidates_by_date dict for budget optimizer
-                candidates_by_date = {date: ranked for date in dates}
-                
-                # Apply comprehensive budget optimization
+                constraints = req.constraints.model_dump() if req.constraints else {}
                 optimizer = BudgetOptimizer(enable_cross_day_rebalance=False)
-                budget_result = optimizer.optimize_trip(
-                    days=days,
-                    trip_context=req.trip_context.model_dump(),
-                    preferences=req.preferences.model_dump(),
-                    constraints=req.constraints.model_dump() if req.constraints else {},
-                    candidates_by_date=candidates_by_date
-                )
+                if constraints.get("daily_budget_cap") is None:
+                    # No cap: optimize_trip only totals the days, so skip building its other inputs
+                    budget_result = optimizer.optimize_trip(
+                        days=days, trip_context={}, preferences={}, constraints=constraints, candidates_by_date={}
+                    )
+                else:
+                    # Create candidates_by_date dict for budget optimizer
+                    candidates_by_date = {date: ranked for date in dates}
+                    
+                    # Apply comprehensive budget optimization
+                    budget_result = optimizer.optimize_trip(
+                        days=days,
+                        trip_context=req.trip_context.model_dump(),
+                        preferences=req.preferences.model_dump(),
+                        constraints=constraints,
+                        candidates_by_date=candidates_by_date
+                    )
                 days = budget_result["days"]
                 budget_totals = budget_result["totals"]
     except Exception as e:
@@ -340,8 +348,7 @@ def build_itinerary(req: ItineraryRequest, request: Request, _: None = Depends(_
     # Rate limit headers
     max_requests = getattr(settings, 'RATE_LIMIT_PER_MINUTE', 10)
     remaining = max(0, max_requests - len(_rate_limit_store.get(client_ip, [])))
-    from fastapi.responses import JSONResponse
-    response = JSONResponse(content=resp)
+    response = DefaultJSONResponse(content=resp)
     response.headers["X-RateLimit-Limit"] = str(max_requests)
     response.headers["X-RateLimit-Remaining"] = str(remaining)
     return response
@@ -408,8 +415,7 @@ def feedback_repack(req: FeedbackRequest, request: Request, _: None = Depends(_c
         }
         total_time = time.time() - overall_start
         log_summary(request_id, round(total_time * 1000, 1), feedback_date=req.date, actions_applied=len(req.actions), locks_preserved=len(req.locks))
-        from fastapi.responses import JSONResponse
-        response = JSONResponse(content=DayPlan(**plan).model_dump())
+        response = DefaultJSONResponse(content=DayPlan(**plan).model_dump())
         max_requests = getattr(settings, 'RATE_LIMIT_PER_MINUTE', 10)
         remaining = max(0, max_requests - len(_rate_limit_store.get(client_ip, [])))
         response.headers["X-RateLimit-Limit"] = str(max_requests)
@@ -5,7 +5,7 @@ Converts 1-5 star ratings into per-tag affinities using EMA and decay.
 
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-import math
+import numpy as np
 
 # Configuration constants
 AFFINITY_ALPHA = 0.25  # EMA smoothing factor
@@ -24,10 +24,29 @@ def rating_weight(rating: int) -> float:
     return (rating - 3) / 2.0
 
 
+def _event_time(event_time: Any, now: datetime) -> datetime:
+    """Parse an event timestamp to a naive datetime, falling back to now."""
+    # Convert timestamp string to datetime if needed
+    if isinstance(event_time, str):
+        try:
+            event_time = datetime.fromisoformat(event_time.replace('Z', '+00:00'))
+            # Make timezone-naive for comparison
+            if event_time.tzinfo is not None:
+                event_time = event_time.replace(tzinfo=None)
+        except ValueError:
+            event_time = now
+    return event_time
+
+
 def compute_affinity_by_tag(feedback_events: List[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, float]:
     """
     Compute tag affinities from feedback events using EMA and decay.
     
+    Equivalent to replaying the events in time order, decaying every affinity
+    between events and EMA-updating each event's tags, but evaluated in closed
+    form: each tag update contributes alpha * weight, shrunk by (1 - alpha)
+    for every later update of the same tag and decayed from its event to now.
+    
     Args:
         feedback_events: List of feedback events with 'rating', 'tags', 'ts' fields
         now: Current time for decay calculation (defaults to now)
@@ -41,54 +60,44 @@ def compute_affinity_by_tag(feedback_events: List[Dict[str, Any]], now: Optional
     # Sort events by timestamp
     sorted_events = sorted(feedback_events, key=lambda e: e.get('ts', now))
     
-    # Initialize affinity tracking
-    affinities = {}
-    last_update_time = None
-    
-    for event in sorted_events:
-        rating = event.get('rating', 3)
-        tags = event.get('tags', [])
-        event_time = event.get('ts', now)
-        
-        # Convert timestamp string to datetime if needed
-        if isinstance(event_time, str):
-            try:
-                event_time = datetime.fromisoformat(event_time.replace('Z', '+00:00'))
-                # Make timezone-naive for comparison
-                if event_time.tzinfo is not None:
-                    event_time = event_time.replace(tzinfo=None)
-            except ValueError:
-                event_time = now
-        
-        # Apply decay to all existing affinities
-        if last_update_time is not None:
-            time_diff = (event_time - last_update_time).total_seconds() / 86400  # Convert to days
-            decay_factor = math.exp(-AFFINITY_DECAY_PER_DAY * time_diff)
-            
-            for tag in affinities:
-                affinities[tag] *= decay_factor
-        
-        # Update affinities for this event's tags
-        weight = rating_weight(rating)
-        
-        for tag in tags:
-            if tag not in affinities:
-                affinities[tag] = 0.0
-            
-            # EMA update: new_value = alpha * weight + (1 - alpha) * old_value
-            affinities[tag] = AFFINITY_ALPHA * weight + (1 - AFFINITY_ALPHA) * affinities[tag]
-        
-        last_update_time = event_time
-    
-    # Apply final decay from last event to now
-    if last_update_time is not None:
-        time_diff = (now - last_update_time).total_seconds() / 86400
-        decay_factor = math.exp(-AFFINITY_DECAY_PER_DAY * time_diff)
-        
-        for tag in affinities:
-            affinities[tag] *= decay_factor
-    
-    return affinities
+    # Flatten to one entry per (event, tag) update, in replay order
+    tag_index: Dict[str, int] = {}
+    update_tags: List[int] = []
+    update_events: List[int] = []
+    ratings = []
+    ages = []
+    for i, event in enumerate(sorted_events):
+        ratings.append(event.get('rating', 3))
+        ages.append((now - _event_time(event.get('ts', now), now)).total_seconds())
+        for tag in event.get('tags', []):
+            update_tags.append(tag_index.setdefault(tag, len(tag_index)))
+            update_events.append(i)
+    
+    rating_arr = np.asarray(ratings, dtype=np.float64)
+    invalid = np.flatnonzero((rating_arr < 1) | (rating_arr > 5))
+    if invalid.size:
+        raise ValueError(f"Rating must be between 1 and 5, got {ratings[invalid[0]]}")
+    
+    if not tag_index:
+        return {}
+    
+    # Per-event EMA input, decayed from the event to now (vectorized rating_weight)
+    weights = (rating_arr - 3) / 2.0
+    decay = np.exp(-AFFINITY_DECAY_PER_DAY * np.asarray(ages, dtype=np.float64) / 86400)
+    contrib = AFFINITY_ALPHA * weights * decay
+    
+    # Group updates by tag, keeping replay order within each tag
+    tags = np.asarray(update_tags, dtype=np.intp)
+    order = np.argsort(tags, kind='stable')
+    sorted_tags = tags[order]
+    counts = np.bincount(sorted_tags, minlength=len(tag_index))
+    position = np.arange(order.size) - (np.cumsum(counts) - counts)[sorted_tags]
+    later_updates = counts[sorted_tags] - 1 - position
+    
+    values = contrib[np.asarray(update_events, dtype=np.intp)[order]] * (1 - AFFINITY_ALPHA) ** later_updates
+    affinities = np.bincount(sorted_tags, weights=values, minlength=len(tag_index))
+    
+    return {tag: float(affinities[i]) for tag, i in tag_index.items()}
 
 
 def get_strongest_affinity_tag(affinities: Dict[str, float], threshold: float = 0.30) -> Optional[tuple]:
@@ -2,10 +2,68 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import List, Dict, Any, Optional, Tuple, Set
 import math
+from collections import Counter
+import numpy as np
+
+# Optional JIT for the swap pre-filter
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except Exception:
+    HAS_NUMBA = False
 
 PRICE_ORDER = {"free": 0, "low": 1, "medium": 2, "high": 3}
 
-@dataclass
+# Days with at least this many items are totalled with numpy reductions;
+# below it the array setup costs more than a Python sum
+NUMPY_TOTALS_MIN_ITEMS = 64
+
+
+def _viable_swaps_np(costs: np.ndarray, durs: np.ndarray, blocked: np.ndarray, max_cost: float, orig_dur: float) -> np.ndarray:
+    """
+    Indices (ascending) of candidates cheaper than max_cost, within ±30% of orig_dur
+    (0 = no duration, accepted as the original's) and not blocked.
+    """
+    mask = (
+        (costs < max_cost)
+        & ((durs == 0) | ((0.7 * orig_dur <= durs) & (durs <= 1.3 * orig_dur)))
+        & ~blocked
+    )
+    return np.flatnonzero(mask)
+
+
+def _masks_similar(a: int, b: int) -> bool:
+    """
+    Swap similarity over tag bitmasks (one bit per distinct tag): Jaccard of the
+    tag sets, as popcount(a & b) / popcount(a | b), must be >= 0.2. An untagged
+    side (mask 0) always counts as similar.
+    """
+    if not a or not b:
+        return True
+    return (a & b).bit_count() / (a | b).bit_count() >= 0.2  # tunable
+
+
+if HAS_NUMBA:
+    # Same selection as _viable_swaps_np in one fused pass; the explicit signature
+    # compiles at import (cached on disk) so the first request doesn't pay for it
+    @njit("int64[:](float64[:], float64[:], boolean[:], float64, float64)", cache=True)
+    def _viable_swaps_jit(costs, durs, blocked, max_cost, orig_dur):
+        out = np.empty(costs.shape[0], dtype=np.int64)
+        n = 0
+        lo = 0.7 * orig_dur
+        hi = 1.3 * orig_dur
+        for i in range(costs.shape[0]):
+            d = durs[i]
+            if costs[i] < max_cost and (d == 0 or (lo <= d and d <= hi)) and not blocked[i]:
+                out[n] = i
+                n += 1
+        return out[:n]
+
+    _viable_swaps = _viable_swaps_jit
+else:
+    _viable_swaps = _viable_swaps_np
+
+@dataclass(slots=True)
 class SwapSuggestion:
     remove_idx: int
     add_candidate: Dict[str, Any]
@@ -73,6 +131,13 @@ class BudgetOptimizer:
             cost += float(it.get("estimated_cost") or 0.0)
         return cost
 
+    def _activity_cost(self, items: List[Dict[str, Any]], activity_idxs: List[int]) -> float:
+        """_estimate_day_cost over known activity indices; same summation order."""
+        cost = 0.0
+        for i in activity_idxs:
+            cost += float(items[i].get("estimated_cost") or 0.0)
+        return cost
+
     def _ensure_notes(self, day: Dict[str, Any]) -> None:
         day.setdefault("notes", [])
         day.setdefault("summary", {}).setdefault("est_cost", round(self._estimate_day_cost(day), 2))
@@ -90,11 +155,11 @@ class BudgetOptimizer:
         Deterministic ordering.
         """
         items = day.get("items", [])
+        # Swaps keep each slot's type, so items are classified once: the day
+        # cost below is re-totalled over activity slots only
+        activity_idxs = [i for i, it in enumerate(items) if it.get("type") != "transfer"]
         # Indices of place items eligible for replacement
-        replace_idxs = [
-            i for i, it in enumerate(items)
-            if it.get("type") != "transfer" and not it.get("locked", False)
-        ]
+        replace_idxs = [i for i in activity_idxs if not items[i].get("locked", False)]
         # Sort expensive-first; tie-break by title/place_id for determinism
         replace_idxs.sort(key=lambda i: (-float(items[i].get("estimated_cost") or 0.0), items[i].get("title", ""), items[i].get("place_id", "")))
 
@@ -102,58 +167,84 @@ class BudgetOptimizer:
         cands = [c for c in day_candidates if self._candidate_allowed(c, avoid_tags)]
         cands.sort(key=lambda c: (float(c.get("estimated_cost") or 0.0), PRICE_ORDER.get(c.get("price_band", "medium"), 2), c.get("title", ""), c.get("place_id", "")))
 
+        # Candidate columns for the vectorized cost/duration/place pre-filter
+        cand_costs = np.array([float(c.get("estimated_cost") or 0.0) for c in cands], dtype=np.float64)
+        cand_durs = np.array([int(c.get("duration_minutes") or 0) for c in cands], dtype=np.float64)
+        cand_idxs_by_pid: Dict[Any, List[int]] = {}
+        for ci, c in enumerate(cands):
+            cand_idxs_by_pid.setdefault(c.get("place_id"), []).append(ci)
+        # Place ids on the day, kept current as swaps land; candidates at any of
+        # them are blocked so a swap never repeats a stop (the original included)
+        on_day = Counter(items[i].get("place_id") for i in activity_idxs)
+        blocked = np.zeros(len(cands), dtype=np.bool_)
+        for pid in on_day:
+            idxs = cand_idxs_by_pid.get(pid)
+            if idxs:
+                blocked[idxs] = True
+
+        # Tag bitmasks (Python ints, so any vocabulary size) for the similarity check
+        tag_bits: Dict[Any, int] = {}
+        cand_masks = [self._tag_mask(c, tag_bits) for c in cands]
+
         swaps_done = False
         visited_pairs: Set[Tuple[str, str]] = set()  # (removed_place_id, added_place_id) to avoid ping-pong
 
         for idx in replace_idxs:
-            if self._estimate_day_cost(day) <= cap:
+            if self._activity_cost(items, activity_idxs) <= cap:
                 break
             original = items[idx]
             orig_cost = float(original.get("estimated_cost") or 0.0)
             if orig_cost <= 0:
                 continue
 
-            # Find first viable cheaper candidate
-            for cand in cands:
-                if cand.get("place_id") == original.get("place_id"):
+            # Cheaper, duration-compatible, not already on the day; _fits_schedule
+            # re-checks duration alongside transfers
+            orig_dur = int(original.get("duration_minutes") or 60)
+            viable = _viable_swaps(cand_costs, cand_durs, blocked, orig_cost, float(orig_dur))
+            orig_mask = self._tag_mask(original, tag_bits)
+
+            # Find first viable cheaper candidate, in cheapest-first order
+            for ci in viable.tolist():
+                if not _masks_similar(orig_mask, cand_masks[ci]):
                     continue
+                cand = cands[ci]
                 if (original.get("place_id"), cand.get("place_id")) in visited_pairs:
                     continue
-                if not self._is_similar_enough(original, cand):
-                    continue
                 if not self._fits_schedule(day, idx, cand, max_transfer_minutes, pace):
                     continue
-                cand_cost = float(cand.get("estimated_cost") or 0.0)
-                if cand_cost >= orig_cost:
-                    continue
+                cand_cost = float(cand_costs[ci])
 
                 # Apply swap
                 saved = orig_cost - cand_cost
                 replacement = self._project_candidate_to_item(original, cand)
                 items[idx] = replacement
                 swaps_done = True
+                self._track_day_place(on_day, blocked, cand_idxs_by_pid, original.get("place_id"), -1)
+                self._track_day_place(on_day, blocked, cand_idxs_by_pid, cand.get("place_id"), 1)
                 visited_pairs.add((original.get("place_id"), cand.get("place_id")))
                 self._add_note(day, f"Budget optimizer: swapped '{original.get('title')}' ({orig_cost}) → '{cand.get('title')}' ({cand_cost}) saving {round(saved,2)}.")
                 # Re-verify transfers for adjacent hops is handled later by routes step; mark as heuristic for now
                 self._mark_adjacent_transfers_for_reverify(day, idx)
-                if self._estimate_day_cost(day) <= cap:
-                    break
+                # One swap per slot; the outer loop stops once under cap
+                break
 
         return swaps_done
 
+    def _track_day_place(self, on_day: Counter, blocked: np.ndarray, cand_idxs_by_pid: Dict[Any, List[int]], place_id: Any, delta: int) -> None:
+        on_day[place_id] += delta
+        idxs = cand_idxs_by_pid.get(place_id)
+        if idxs:
+            blocked[idxs] = on_day[place_id] > 0
+
     def _candidate_allowed(self, c: Dict[str, Any], avoid_tags: Set[str]) -> bool:
-        tags = set(c.get("tags") or [])
-        return avoid_tags.isdisjoint(tags)
-
-    def _is_similar_enough(self, a: Dict[str, Any], b: Dict[str, Any]) -> bool:
-        # Simple Jaccard on tags; require minimal overlap to keep trip theme coherent
-        ta, tb = set(a.get("tags") or []), set(b.get("tags") or [])
-        if not ta or not tb:
-            return True
-        inter = len(ta & tb)
-        denom = len(ta | tb)
-        jacc = inter / denom if denom else 0.0
-        return jacc >= 0.2  # tunable
+        return avoid_tags.isdisjoint(c.get("tags") or ())
+
+    def _tag_mask(self, entry: Dict[str, Any], tag_bits: Dict[Any, int]) -> int:
+        """Bitmask of entry's tags, assigning the next free bit to unseen tags."""
+        mask = 0
+        for t in entry.get("tags") or ():
+            mask |= 1 << tag_bits.setdefault(t, len(tag_bits))
+        return mask
 
     def _fits_schedule(self, day: Dict[str, Any], idx: int, cand: Dict[str, Any], max_transfer_minutes: int, pace: str) -> bool:
         """
@@ -201,15 +292,30 @@ class BudgetOptimizer:
                 items[j]["source"] = "heuristic"
 
     # ---------- Totals ----------
+    def _day_totals(self, day: Dict[str, Any]) -> Tuple[float, int]:
+        """(activity cost, transfer minutes) for a day, in one pass over its items."""
+        items = day.get("items", [])
+        if len(items) >= NUMPY_TOTALS_MIN_ITEMS:
+            is_transfer = np.fromiter((it.get("type") == "transfer" for it in items), dtype=np.bool_, count=len(items))
+            costs = np.fromiter((0.0 if t else float(it.get("estimated_cost") or 0.0) for it, t in zip(items, is_transfer.tolist())), dtype=np.float64, count=len(items))
+            minutes = np.fromiter((int(it.get("duration_minutes") or 0) if t else 0 for it, t in zip(items, is_transfer.tolist())), dtype=np.int64, count=len(items))
+            return float(np.add.reduce(costs)), int(np.add.reduce(minutes))
+        cost = 0.0
+        transfer_minutes = 0
+        for it in items:
+            if it.get("type") == "transfer":
+                transfer_minutes += int(it.get("duration_minutes") or 0)
+            else:
+                cost += float(it.get("estimated_cost") or 0.0)
+        return cost, transfer_minutes
+
     def _compute_trip_totals(self, days: List[Dict[str, Any]]) -> Dict[str, Any]:
         trip_cost = 0.0
         transfer_minutes = 0
         daily = []
         for d in days:
-            dc = self._estimate_day_cost(d)
-            for it in d.get("items", []):
-                if it.get("type") == "transfer":
-                    transfer_minutes += int(it.get("duration_minutes") or 0)
+            dc, dm = self._day_totals(d)
+            transfer_minutes += dm
             d.setdefault("summary", {})["est_cost"] = round(dc, 2)
             daily.append({"date": d.get("date"), "est_cost": round(dc, 2)})
             trip_cost += dc
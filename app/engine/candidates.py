@@ -3,9 +3,14 @@ Deterministic candidate generator with explainable drop reasons.
 """
 
 from __future__ import annotations
-from typing import List, Dict, Any, Tuple
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Optional
 from math import radians, sin, cos, asin, sqrt
+import numpy as np
 from app.dataset.fixtures import load_fixture_pois
+from app.engine.rules import hhmm_to_minutes, open_periods, parse_open_periods
 
 PRICE_ORDER = {"free": 0, "low": 1, "medium": 2, "high": 3}
 
@@ -13,44 +18,87 @@ PRICE_ORDER = {"free": 0, "low": 1, "medium": 2, "high": 3}
 DEFAULT_RADIUS_KM = 50
 
 
+# Tag/theme vocabularies larger than this fall back to per-POI set checks
+_MASK_BITS = 64
+
+
+@dataclass(slots=True, frozen=True)
+class _PoiTable:
+    """Normalized POIs plus per-POI tag/theme bitmasks over interned vocabularies."""
+    pois: Tuple[Dict[str, Any], ...]
+    tag_bits: Dict[str, int]
+    theme_bits: Dict[str, int]
+    tag_masks: Optional[np.ndarray]    # uint64[N], None if the vocabulary exceeds _MASK_BITS
+    theme_masks: Optional[np.ndarray]
+    lats: np.ndarray                   # float64[N], degrees
+    lngs: np.ndarray
+
+
+def _normalize_poi(poi: Dict[str, Any]) -> Dict[str, Any]:
+    # Tag/theme strings are interned: the JSON parser makes a fresh copy of
+    # every occurrence, and the filters hash and compare them per request
+    tags = [sys.intern(t) for t in poi.get("tags", [])]
+    return {
+        "poi_id": poi["poi_id"],
+        "place_id": poi["place_id"],
+        "name": poi.get("name", poi.get("title", "")),
+        "title": poi.get("name", poi.get("title", "")),
+        "tags": tags,
+        "themes": [sys.intern(t) for t in poi.get("themes", [])],
+        "price_band": poi.get("price_band", "low"),
+        "estimated_cost": poi.get("estimated_cost", 0),
+        "opening_hours": poi.get("opening_hours", {}),
+        "seasonality": poi.get("seasonality", []),
+        "duration_minutes": poi.get("duration_minutes", 60),
+        "safety_flags": poi.get("safety_flags", []),
+        "coords": poi.get("coords", {"lat": 0.0, "lng": 0.0}),
+        "region": poi.get("region", "Unknown"),
+        "last_verified": poi.get("last_verified", "2025-01-01T00:00:00Z"),
+        # Opening hours as integer minute intervals, parsed once at load
+        "_open_periods": parse_open_periods(poi.get("opening_hours", {})),
+        # Lower-cased tags for the case-insensitive avoid-tag match
+        "_tags_lower": tuple(sys.intern(t.lower()) for t in tags),
+    }
+
+
+def _bitmasks(values: List[List[str]]) -> Tuple[Dict[str, int], Optional[np.ndarray]]:
+    """Assign each distinct value a bit and OR each row's bits into a uint64 mask."""
+    bits: Dict[str, int] = {}
+    for row in values:
+        for v in row:
+            bits.setdefault(v, len(bits))
+    if len(bits) > _MASK_BITS:
+        return bits, None
+    masks = np.array([sum({1 << bits[v] for v in row}) for row in values], dtype=np.uint64)
+    return bits, masks
+
+
+@lru_cache(maxsize=1)
+def _poi_table() -> _PoiTable:
+    """Load and normalize the fixture POIs once per process."""
+    pois = tuple(_normalize_poi(poi) for poi in load_fixture_pois())
+    tag_bits, tag_masks = _bitmasks([poi["tags"] for poi in pois])
+    theme_bits, theme_masks = _bitmasks([poi["themes"] for poi in pois])
+    lats, lngs = _coord_arrays(pois)
+    return _PoiTable(pois, tag_bits, theme_bits, tag_masks, theme_masks, lats, lngs)
+
+
 def load_all_pois() -> List[Dict[str, Any]]:
     """
     Return POIs as list[dict] with fields:
     poi_id, place_id, name/title, tags, themes, price_band, estimated_cost,
     opening_hours, seasonality, duration_minutes, safety_flags, coords {lat,lng}, region, last_verified
     Load from fixture dataset.
+
+    The dataset is parsed once; each call returns fresh top-level dicts so
+    per-request annotations don't leak between requests.
     """
-    pois = load_fixture_pois()
-    
-    # Normalize field names to match expected schema
-    normalized_pois = []
-    for poi in pois:
-        normalized = {
-            "poi_id": poi["poi_id"],
-            "place_id": poi["place_id"],
-            "name": poi.get("name", poi.get("title", "")),
-            "title": poi.get("name", poi.get("title", "")),
-            "tags": poi.get("tags", []),
-            "themes": poi.get("themes", []),
-            "price_band": poi.get("price_band", "low"),
-            "estimated_cost": poi.get("estimated_cost", 0),
-            "opening_hours": poi.get("opening_hours", {}),
-            "seasonality": poi.get("seasonality", []),
-            "duration_minutes": poi.get("duration_minutes", 60),
-            "safety_flags": poi.get("safety_flags", []),
-            "coords": poi.get("coords", {"lat": 0.0, "lng": 0.0}),
-            "region": poi.get("region", "Unknown"),
-            "last_verified": poi.get("last_verified", "2025-01-01T00:00:00Z")
-        }
-        normalized_pois.append(normalized)
-    
-    return normalized_pois
+    return [dict(poi) for poi in _poi_table().pois]
 
 
 def resolve_base_coords(base_place_id: str) -> Tuple[float, float]:
     """Return (lat,lng) for base place_id from dataset."""
-    pois = load_all_pois()
-    for poi in pois:
+    for poi in _poi_table().pois:
         if poi["place_id"] == base_place_id:
             coords = poi["coords"]
             return coords["lat"], coords["lng"]
@@ -78,21 +126,28 @@ def haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
     return c * r
 
 
+def _coord_arrays(pois) -> Tuple[np.ndarray, np.ndarray]:
+    """POI latitudes and longitudes (degrees) as float64 arrays."""
+    coords = [poi.get("coords", {}) for poi in pois]
+    lats = np.array([c.get("lat", 0.0) for c in coords], dtype=np.float64)
+    lngs = np.array([c.get("lng", 0.0) for c in coords], dtype=np.float64)
+    return lats, lngs
+
+
+def _haversine_km_np(base: Tuple[float, float], lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """haversine_km from base to every (lats[i], lngs[i]) in one ufunc pass."""
+    lat1, lng1 = radians(base[0]), radians(base[1])
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs) - lng1
+    a = np.sin(dlat / 2) ** 2 + cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * np.arcsin(np.sqrt(a)) * 6371
+
+
 def window_by_region(pois: List[Dict[str, Any]], base: Tuple[float, float], radius_km: float) -> List[Dict[str, Any]]:
     """Return POIs within radius_km of base."""
-    base_lat, base_lng = base
-    filtered = []
-    
-    for poi in pois:
-        coords = poi.get("coords", {})
-        poi_lat = coords.get("lat", 0.0)
-        poi_lng = coords.get("lng", 0.0)
-        
-        distance = haversine_km((base_lat, base_lng), (poi_lat, poi_lng))
-        if distance <= radius_km:
-            filtered.append(poi)
-    
-    return filtered
+    distances = _haversine_km_np(base, *_coord_arrays(pois))
+    return [pois[i] for i in np.flatnonzero(distances <= radius_km).tolist()]
 
 
 def opening_alignment(poi: Dict[str, Any], day_slot: Dict[str, str]) -> float:
@@ -104,62 +159,37 @@ def opening_alignment(poi: Dict[str, Any], day_slot: Dict[str, str]) -> float:
     if not opening_hours:
         return 0.5  # Neutral score if no opening hours data
     
-    day_start = day_slot.get("start", "08:00")
-    day_end = day_slot.get("end", "20:00")
+    day_start_min = hhmm_to_minutes(day_slot.get("start", "08:00"))
+    day_end_min = hhmm_to_minutes(day_slot.get("end", "20:00"))
+    day_duration = day_end_min - day_start_min
     
-    # Convert time strings to minutes since midnight
-    def time_to_minutes(time_str: str) -> int:
-        try:
-            hour, minute = map(int, time_str.split(":"))
-            return hour * 60 + minute
-        except:
-            return 0
-    
-    day_start_min = time_to_minutes(day_start)
-    day_end_min = time_to_minutes(day_end)
-    
-    # Check each day of the week for overlap
+    # Check each opening period across the week for overlap
     max_overlap = 0.0
-    for day_name in ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]:
-        day_hours = opening_hours.get(day_name, [])
-        if not day_hours:
-            continue
+    for open_min, close_min in open_periods(poi):
+        # Calculate overlap
+        overlap_start = max(day_start_min, open_min)
+        overlap_end = min(day_end_min, close_min)
         
-        for period in day_hours:
-            open_time = period.get("open", "00:00")
-            close_time = period.get("close", "23:59")
-            
-            open_min = time_to_minutes(open_time)
-            close_min = time_to_minutes(close_time)
-            
-            # Calculate overlap
-            overlap_start = max(day_start_min, open_min)
-            overlap_end = min(day_end_min, close_min)
-            
-            if overlap_start < overlap_end:
-                overlap_duration = overlap_end - overlap_start
-                day_duration = day_end_min - day_start_min
-                overlap_ratio = overlap_duration / day_duration if day_duration > 0 else 0
-                max_overlap = max(max_overlap, overlap_ratio)
+        if overlap_start < overlap_end:
+            overlap_duration = overlap_end - overlap_start
+            overlap_ratio = overlap_duration / day_duration if day_duration > 0 else 0
+            max_overlap = max(max_overlap, overlap_ratio)
     
     return max_overlap
 
 
-def annotate_runtime_fields(pois: List[Dict[str, Any]], base: Tuple[float, float], day_slot: Dict[str, str]) -> None:
-    """Annotate each candidate with 'opening_align' (float) and 'distance_km' (float)."""
-    base_lat, base_lng = base
+def annotate_runtime_fields(pois: List[Dict[str, Any]], base: Tuple[float, float], day_slot: Dict[str, str],
+                            distances: Optional[List[float]] = None) -> None:
+    """
+    Annotate each candidate with 'opening_align' (float) and 'distance_km' (float).
+    `distances` are precomputed distance_km values, one per POI; computed here if omitted.
+    """
+    if distances is None:
+        distances = _haversine_km_np(base, *_coord_arrays(pois)).tolist()
     
-    for poi in pois:
-        # Calculate distance
-        coords = poi.get("coords", {})
-        poi_lat = coords.get("lat", 0.0)
-        poi_lng = coords.get("lng", 0.0)
-        distance = haversine_km((base_lat, base_lng), (poi_lat, poi_lng))
+    for poi, distance in zip(pois, distances):
         poi["distance_km"] = distance
-        
-        # Calculate opening alignment
-        alignment = opening_alignment(poi, day_slot)
-        poi["opening_align"] = alignment
+        poi["opening_align"] = opening_alignment(poi, day_slot)
 
 
 def prefilter_by_themes_tags(pois: List[Dict[str, Any]], preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -170,27 +200,46 @@ def prefilter_by_themes_tags(pois: List[Dict[str, Any]], preferences: Dict[str,
     if not themes and not activity_tags:
         return pois  # No preferences, keep all
     
-    filtered = []
-    for poi in pois:
-        poi_themes = set(poi.get("themes", []))
-        poi_tags = set(poi.get("tags", []))
-        
-        # Check for any overlap
-        theme_overlap = bool(themes & poi_themes)
-        tag_overlap = bool(activity_tags & poi_tags)
-        
-        if theme_overlap or tag_overlap:
-            filtered.append(poi)
+    # Probe the preference sets directly instead of building sets per POI
+    return [
+        poi for poi in pois
+        if not themes.isdisjoint(poi.get("themes", ()))
+        or not activity_tags.isdisjoint(poi.get("tags", ()))
+    ]
+
+
+def _prefilter_keep(table: _PoiTable, preferences: Dict[str, Any]) -> np.ndarray:
+    """
+    prefilter_by_themes_tags over the whole table as a bool[N] keep mask,
+    computed in one bitwise pass over the tag/theme masks.
+    """
+    themes = preferences.get("themes", [])
+    activity_tags = preferences.get("activity_tags", [])
+    if not themes and not activity_tags:
+        return np.ones(len(table.pois), dtype=bool)
+    if table.tag_masks is None or table.theme_masks is None:
+        kept = {id(poi) for poi in prefilter_by_themes_tags(table.pois, preferences)}
+        return np.array([id(poi) in kept for poi in table.pois], dtype=bool)
     
-    return filtered
+    # Preference terms outside the vocabulary match no POI and contribute no bits
+    want_themes = np.uint64(sum({1 << table.theme_bits[t] for t in themes if t in table.theme_bits}))
+    want_tags = np.uint64(sum({1 << table.tag_bits[t] for t in activity_tags if t in table.tag_bits}))
+    return ((table.theme_masks & want_themes) != 0) | ((table.tag_masks & want_tags) != 0)
+
+
+def _prefilter_table(table: _PoiTable, preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Fresh copies of the POIs kept by _prefilter_keep, in table order."""
+    keep = _prefilter_keep(table, preferences)
+    return [dict(table.pois[i]) for i in np.flatnonzero(keep).tolist()]
 
 
 def generate_candidates(trip_context: Dict[str, Any], preferences: Dict[str, Any], constraints: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
     """
     Steps:
       1) Load POIs
-      2) Region window around base_place_id (default radius 30–60 km; env or constant)
-      3) Prefilter by theme/tag overlap
+      2) Prefilter by theme/tag overlap (bitmask pass over the cached POI table)
+      3) Region window around base_place_id (default radius 30–60 km; env or constant),
+         with distances for the whole table computed in one vectorized pass
       4) Annotate opening_align + distance_km
       5) Apply rules.filter_candidates(...) (returns kept, drop_log)
       6) Deterministic sort keepers by:
@@ -198,38 +247,37 @@ def generate_candidates(trip_context: Dict[str, Any], preferences: Dict[str, Any
     """
     from .rules import filter_candidates
     
-    # Step 1: Load POIs
-    all_pois = load_all_pois()
+    # Steps 1-2: Load POIs and prefilter by themes/tags; both filters keep
+    # order, so running this before the region window gives the same result
+    table = _poi_table()
+    keep = _prefilter_keep(table, preferences)
     
-    # Step 2: Region window
+    # Step 3: Region window
     base_place_id = trip_context.get("base_place_id")
     base_coords = resolve_base_coords(base_place_id)
     radius_km = constraints.get("radius_km", DEFAULT_RADIUS_KM)
-    regional_pois = window_by_region(all_pois, base_coords, radius_km)
+    distances = _haversine_km_np(base_coords, table.lats, table.lngs)
+    kept_idx = np.flatnonzero(keep & (distances <= radius_km)).tolist()
+    regional_pois = [dict(table.pois[i]) for i in kept_idx]
     
-    # Step 3: Prefilter by themes/tags
+    # Step 4: Annotate runtime fields, reusing the window's distances
     day_template = trip_context.get("day_template", {})
-    themed_pois = prefilter_by_themes_tags(regional_pois, preferences)
-    
-    # Step 4: Annotate runtime fields
-    annotate_runtime_fields(themed_pois, base_coords, day_template)
+    annotate_runtime_fields(regional_pois, base_coords, day_template, distances[kept_idx].tolist())
     
     # Step 5: Apply hard filters
-    kept, drop_log = filter_candidates(themed_pois, trip_context, preferences, constraints)
+    kept, drop_log = filter_candidates(regional_pois, trip_context, preferences, constraints)
+    
+    # Step 6: Deterministic sort. list.sort calls the key once per POI; the
+    # preference sets are built once here rather than inside it
+    themes = set(preferences.get("themes", []))
+    activity_tags = set(preferences.get("activity_tags", []))
     
-    # Step 6: Deterministic sort
     def sort_key(poi):
-        price_band = poi.get("price_band", "low")
-        price_order = PRICE_ORDER.get(price_band, 1)
+        price_order = PRICE_ORDER.get(poi.get("price_band", "low"), 1)
         opening_align = poi.get("opening_align", 0.0)
         
         # Calculate theme overlap score
-        themes = set(preferences.get("themes", []))
-        activity_tags = set(preferences.get("activity_tags", []))
-        poi_themes = set(poi.get("themes", []))
-        poi_tags = set(poi.get("tags", []))
-        
-        theme_overlap = len(themes & poi_themes) + len(activity_tags & poi_tags)
+        theme_overlap = len(themes.intersection(poi.get("themes", []))) + len(activity_tags.intersection(poi.get("tags", [])))
         
         name = poi.get("name", poi.get("title", ""))
         poi_id = poi.get("poi_id", "")
@@ -1,10 +1,18 @@
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime
 import logging
+import numpy as np
 from app.config import get_settings
 from app.engine.reranker import affinity_bonus_for_poi
 from app.engine.ml_pref import get_preference_scorer
 
+# Optional JIT for the numeric time/budget fit kernel
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except Exception:
+    HAS_NUMBA = False
+
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
@@ -19,14 +27,19 @@ def _calculate_pref_fit(poi: Dict[str, Any], prefs: Dict[str, Any], context: Dic
     return scorer.predict_pref_fit(poi, context, prefs)
 
 
+def _day_length(day_start: str, day_end: str) -> int:
+    """Minutes between two HH:MM times."""
+    start_min = int(day_start.split(":")[0]) * 60 + int(day_start.split(":")[1])
+    end_min = int(day_end.split(":")[0]) * 60 + int(day_end.split(":")[1])
+    return end_min - start_min
+
+
 def _calculate_time_fit(poi: Dict[str, Any], day_start: str, day_end: str) -> float:
     """Calculate time fit score based on duration and open windows."""
     duration = int(poi.get("duration_minutes") or 60)
     
     # Convert day window to minutes
-    start_min = int(day_start.split(":")[0]) * 60 + int(day_start.split(":")[1])
-    end_min = int(day_end.split(":")[0]) * 60 + int(day_end.split(":")[1])
-    day_length = end_min - start_min
+    day_length = _day_length(day_start, day_end)
     
     # Prefer activities that fit well within the day
     if duration > day_length:
@@ -64,6 +77,57 @@ def _calculate_budget_fit(poi: Dict[str, Any], daily_cap: float | None) -> float
         return 0.6  # Uses most of budget
 
 
+def _time_budget_fits_np(costs: np.ndarray, durations: np.ndarray, daily_cap: float, day_length: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    _calculate_time_fit and _calculate_budget_fit over whole columns; durations
+    are already int-truncated and daily_cap is a real cap (None handled by caller).
+    """
+    time_fit = np.where(durations > day_length, 0.0,
+                        np.where((60 <= durations) & (durations <= 180), 1.0,
+                                 np.where(durations < 60, 0.7, 0.8)))
+    # A zero cap only admits free items; count them as good value rather than 0/0
+    budget_ratio = costs / daily_cap if daily_cap > 0 else np.zeros_like(costs)
+    budget_fit = np.where(costs > daily_cap, 0.0,
+                          np.where((0.2 <= budget_ratio) & (budget_ratio <= 0.8), 1.0,
+                                   np.where(budget_ratio < 0.2, 0.8, 0.6)))
+    return time_fit, budget_fit
+
+
+if HAS_NUMBA:
+    # Same piecewise fits in one fused pass; no fastmath, so scores (and with
+    # them tie order) match the scalar functions bit for bit
+    @njit("UniTuple(float64[:], 2)(float64[:], float64[:], float64, float64)", cache=True)
+    def _time_budget_fits_jit(costs, durations, daily_cap, day_length):
+        n = costs.shape[0]
+        time_fit = np.empty(n)
+        budget_fit = np.empty(n)
+        for i in range(n):
+            d = durations[i]
+            if d > day_length:
+                time_fit[i] = 0.0
+            elif 60 <= d <= 180:
+                time_fit[i] = 1.0
+            elif d < 60:
+                time_fit[i] = 0.7
+            else:
+                time_fit[i] = 0.8
+            c = costs[i]
+            r = c / daily_cap if daily_cap > 0 else 0.0
+            if c > daily_cap:
+                budget_fit[i] = 0.0
+            elif 0.2 <= r <= 0.8:
+                budget_fit[i] = 1.0
+            elif r < 0.2:
+                budget_fit[i] = 0.8
+            else:
+                budget_fit[i] = 0.6
+        return time_fit, budget_fit
+
+    _time_budget_fits = _time_budget_fits_jit
+else:
+    _time_budget_fits = _time_budget_fits_np
+
+
 def _calculate_diversity(poi: Dict[str, Any], scheduled_items: List[Dict[str, Any]]) -> float:
     """Calculate diversity score to avoid repetition."""
     if not scheduled_items:
@@ -220,20 +284,39 @@ def rank(cands: List[Dict[str, Any]], daily_cap: float | None, prefs: Dict[str,
     scorer = get_preference_scorer()
     pref_model_version = scorer.version()
     
-    # Calculate scores for all candidates
-    scored_cands = []
-    for cand in cands:
-        score = _score(cand, daily_cap, prefs, day_start, day_end, pace, scheduled_items, affinities, context)
-        scored_cands.append((cand, score))
+    # Numeric fits for all candidates at once; per-POI fits stay in Python
+    n = len(cands)
+    durations = np.fromiter((int(c.get("duration_minutes") or 60) for c in cands), dtype=np.float64, count=n)
+    costs = np.fromiter((float(c.get("estimated_cost") or 0) for c in cands), dtype=np.float64, count=n)
+    cap = 1.0 if daily_cap is None else float(daily_cap)
+    time_fit, budget_fit = _time_budget_fits(costs, durations, cap, float(_day_length(day_start, day_end)))
+    if daily_cap is None:
+        budget_fit = np.full(n, 0.5)  # Neutral if no budget constraint
+    pref_fit = np.fromiter((_calculate_pref_fit(c, prefs, context) for c in cands), dtype=np.float64, count=n)
+    diversity = np.fromiter((_calculate_diversity(c, scheduled_items) for c in cands), dtype=np.float64, count=n)
+    health_fit = np.fromiter((_calculate_health_fit(c, pace) for c in cands), dtype=np.float64, count=n)
+    safety_penalty = np.fromiter((_calculate_safety_penalty(c, prefs) for c in cands), dtype=np.float64, count=n)
+    
+    # Same operation order as _score, so each score is bit-identical to it
+    scores = (
+        settings.RANK_W_PREF * pref_fit +
+        settings.RANK_W_TIME * time_fit +
+        settings.RANK_W_BUDGET * budget_fit +
+        settings.RANK_W_DIV * diversity +
+        settings.RANK_W_HEALTH * health_fit
+    )
+    scores -= safety_penalty
+    if affinities:
+        scores += np.fromiter((affinity_bonus_for_poi(c, affinities) for c in cands), dtype=np.float64, count=n)
     
-    # Sort by score descending
-    ranked = [cand for cand, score in sorted(scored_cands, key=lambda x: x[1], reverse=True)]
+    # Sort by score descending; stable, so ties keep input order
+    ranked = [cands[i] for i in np.argsort(-scores, kind="stable").tolist()]
     
-    # Calculate average scores for logging
-    if scored_cands:
-        avg_pref = sum(_calculate_pref_fit(cand, prefs, context) for cand, _ in scored_cands) / len(scored_cands)
-        avg_time = sum(_calculate_time_fit(cand, day_start, day_end) for cand, _ in scored_cands) / len(scored_cands)
-        avg_budget = sum(_calculate_budget_fit(cand, daily_cap) for cand, _ in scored_cands) / len(scored_cands)
+    # Average scores for logging, reusing the fits computed above
+    if n:
+        avg_pref = sum(pref_fit.tolist()) / n
+        avg_time = sum(time_fit.tolist()) / n
+        avg_budget = sum(budget_fit.tolist()) / n
     else:
         avg_pref = avg_time = avg_budget = 0.0
     
@@ -22,13 +22,16 @@ def candidate_tag_affinity(candidate: Dict[str, Any], aff_by_tag: Dict[str, floa
     Returns:
         Average affinity score for the candidate's tags
     """
-    candidate_tags = set(candidate.get("tags", []))
-    
+    return _tags_affinity(frozenset(candidate.get("tags", [])), aff_by_tag)
+
+
+def _tags_affinity(candidate_tags: frozenset, aff_by_tag: Dict[str, float]) -> float:
+    """Average affinity over a candidate's (already deduplicated) tags."""
     if not candidate_tags or not aff_by_tag:
         return 0.0
     
     # Calculate average affinity for candidate's tags
-    tag_affinities = [aff_by_tag.get(tag, 0.0) for tag in candidate_tags if tag in aff_by_tag]
+    tag_affinities = [aff_by_tag[tag] for tag in candidate_tags if tag in aff_by_tag]
     
     if not tag_affinities:
         return 0.0
@@ -78,11 +81,16 @@ def rerank_candidates(candidates: List[Dict[str, Any]], audit_log: Dict[str, Any
     
     # Rerank candidates
     reranked = []
+    # Same for every candidate
+    strongest_tag_info = get_strongest_affinity_tag(aff_by_tag, RERANK_REASON_THRESHOLD)
     
     for candidate in candidates:
+        # Tags frozen once, shared by the affinity average and the reason check
+        candidate_tags = frozenset(candidate.get("tags", []))
+        
         # Calculate new score
         base_score = candidate.get(base_key, 0.0)
-        tag_affinity = candidate_tag_affinity(candidate, aff_by_tag)
+        tag_affinity = _tags_affinity(candidate_tags, aff_by_tag)
         new_score = base_score + RERANK_LAMBDA * tag_affinity
         
         # Create reranked candidate
@@ -90,10 +98,8 @@ def rerank_candidates(candidates: List[Dict[str, Any]], audit_log: Dict[str, Any
         reranked_candidate["score"] = new_score
         
         # Add reason if affinity is strong enough
-        strongest_tag_info = get_strongest_affinity_tag(aff_by_tag, RERANK_REASON_THRESHOLD)
         if strongest_tag_info:
             tag, affinity = strongest_tag_info
-            candidate_tags = set(candidate.get("tags", []))
             if tag in candidate_tags:
                 reranked_candidate["reason"] = format_affinity_reason(tag, affinity)
         
@@ -134,20 +140,23 @@ def rerank_candidates_with_metadata(candidates: List[Dict[str, Any]], audit_log:
     # Count candidates with reasons
     candidates_with_reasons = 0
     reranked = []
+    # Same for every candidate
+    strongest_tag_info = get_strongest_affinity_tag(aff_by_tag, RERANK_REASON_THRESHOLD)
     
     for candidate in candidates:
+        # Tags frozen once, shared by the affinity average and the reason check
+        candidate_tags = frozenset(candidate.get("tags", []))
+        
         base_score = candidate.get(base_key, 0.0)
-        tag_affinity = candidate_tag_affinity(candidate, aff_by_tag)
+        tag_affinity = _tags_affinity(candidate_tags, aff_by_tag)
         new_score = base_score + RERANK_LAMBDA * tag_affinity
         
         reranked_candidate = dict(candidate)
         reranked_candidate["score"] = new_score
         
         # Add reason if affinity is strong enough
-        strongest_tag_info = get_strongest_affinity_tag(aff_by_tag, RERANK_REASON_THRESHOLD)
         if strongest_tag_info:
             tag, affinity = strongest_tag_info
-            candidate_tags = set(candidate.get("tags", []))
             if tag in candidate_tags:
                 reranked_candidate["reason"] = format_affinity_reason(tag, affinity)
                 candidates_with_reasons += 1
@@ -3,10 +3,22 @@ Hardened rules layer for candidate filtering with explainable drop reasons.
 """
 
 from __future__ import annotations
-from typing import List, Dict, Any, Tuple, Iterable
+from typing import List, Dict, Any, Tuple, Iterable, Optional, FrozenSet
 import datetime
+from functools import lru_cache
 from math import radians, sin, cos, asin, sqrt
 
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# Heuristic travel speeds (km/h); unknown modes use DEFAULT_MODE_SPEED
+MODE_SPEEDS = {
+    "DRIVE": 40.0,
+    "WALK": 4.5,
+    "BIKE": 15.0,
+    "TRANSIT": 25.0,
+}
+DEFAULT_MODE_SPEED = 20.0
+
 
 def haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
     """Calculate distance between two points using Haversine formula."""
@@ -41,93 +53,123 @@ def theme_overlap(poi: Dict[str, Any], prefs: Dict[str, Any]) -> int:
     return theme_matches + tag_matches
 
 
-def violates_avoid_tags(poi: Dict[str, Any], avoid: Iterable[str]) -> str | None:
-    """Return offending tag or None."""
-    avoid_set = set(avoid)
-    poi_tags = set(poi.get("tags", []))
+def avoid_terms(avoid: Iterable[str]) -> Tuple[Tuple[str, str], ...]:
+    """Distinct avoid tags paired with their lower-cased form, built once per request."""
+    return tuple((tag, tag.lower()) for tag in set(avoid))
+
+
+def _violates_avoid_terms(poi: Dict[str, Any], terms: Tuple[Tuple[str, str], ...]) -> str | None:
+    """violates_avoid_tags against terms from avoid_terms."""
+    poi_tags = poi.get("tags")
+    if not poi_tags:
+        return None
     
     # Check for exact matches
-    for tag in avoid_set:
+    for tag, _ in terms:
         if tag in poi_tags:
             return tag
     
-    # Check for partial matches (case-insensitive)
-    for avoid_tag in avoid_set:
-        for poi_tag in poi_tags:
-            if avoid_tag.lower() in poi_tag.lower() or poi_tag.lower() in avoid_tag.lower():
+    # Check for partial matches (case-insensitive); loaded POIs carry their tags lower-cased
+    poi_lower = poi.get("_tags_lower")
+    if poi_lower is None:
+        poi_lower = [poi_tag.lower() for poi_tag in poi_tags]
+    for avoid_tag, avoid_lower in terms:
+        for tag_lower in poi_lower:
+            if avoid_lower in tag_lower or tag_lower in avoid_lower:
                 return avoid_tag
     
     return None
 
 
-def in_season(poi: Dict[str, Any], date_range: Dict[str, str]) -> bool:
-    """Month-based seasonality check; true if any month in range is in poi.seasonality (or no seasonality)."""
-    seasonality = poi.get("seasonality", [])
-    if not seasonality:
-        return True  # No seasonality restrictions
-    
-    # Extract months from date range
-    start_date = date_range.get("start", "")
-    end_date = date_range.get("end", "")
-    
+def violates_avoid_tags(poi: Dict[str, Any], avoid: Iterable[str]) -> str | None:
+    """Return offending tag or None."""
+    return _violates_avoid_terms(poi, avoid_terms(avoid))
+
+
+@lru_cache(maxsize=1024)
+def hhmm_to_minutes(time_str: str) -> int:
+    """Convert "HH:MM" to minutes since midnight; 0 if unparseable. Memoized, as POIs share a few times."""
+    try:
+        hour, minute = map(int, time_str.split(":"))
+        return hour * 60 + minute
+    except:
+        return 0
+
+
+def parse_open_periods(opening_hours: Dict[str, Any]) -> Tuple[Tuple[int, int], ...]:
+    """(open_min, close_min) for every opening period across the week, mon..sun."""
+    return tuple(
+        (hhmm_to_minutes(period.get("open", "00:00")), hhmm_to_minutes(period.get("close", "23:59")))
+        for day_name in WEEKDAYS
+        for period in (opening_hours.get(day_name) or ())
+    )
+
+
+def open_periods(poi: Dict[str, Any]) -> Tuple[Tuple[int, int], ...]:
+    """The POI's opening periods in minutes, precomputed at load when available."""
+    periods = poi.get("_open_periods")
+    if periods is None:
+        periods = parse_open_periods(poi.get("opening_hours", {}))
+    return periods
+
+
+@lru_cache(maxsize=256)
+def range_months(start_date: str, end_date: str) -> Optional[FrozenSet[str]]:
+    """Month abbreviations ("Jan".."Dec") touched by the date range; None if a date is unparseable."""
     try:
         start_dt = datetime.datetime.strptime(start_date, "%Y-%m-%d")
         end_dt = datetime.datetime.strptime(end_date, "%Y-%m-%d")
-        
-        # Check if any month in the range is in seasonality
-        current = start_dt
-        while current <= end_dt:
-            month_name = current.strftime("%b")
-            if month_name in seasonality:
-                return True
-            current = current.replace(day=1) + datetime.timedelta(days=32)
-            current = current.replace(day=1)
-        
-        return False
     except ValueError:
-        return True  # Invalid date format, be lenient
+        return None
+    
+    months = set()
+    current = start_dt
+    while current <= end_dt:
+        months.add(current.strftime("%b"))
+        current = current.replace(day=1) + datetime.timedelta(days=32)
+        current = current.replace(day=1)
+    return frozenset(months)
 
 
-def is_open_for_day(poi: Dict[str, Any], day_slot: Dict[str, str]) -> bool:
-    """True if any period overlaps day window; if opening_hours missing → be lenient (True)."""
-    opening_hours = poi.get("opening_hours", {})
-    if not opening_hours:
+def _in_season_months(poi: Dict[str, Any], months: Optional[FrozenSet[str]]) -> bool:
+    """in_season against the range's months, as returned by range_months."""
+    seasonality = poi.get("seasonality", [])
+    if not seasonality or months is None:
+        return True  # No seasonality restrictions, or invalid date format: be lenient
+    return not months.isdisjoint(seasonality)
+
+
+def in_season(poi: Dict[str, Any], date_range: Dict[str, str]) -> bool:
+    """Month-based seasonality check; true if any month in range is in poi.seasonality (or no seasonality)."""
+    months = range_months(date_range.get("start", ""), date_range.get("end", ""))
+    return _in_season_months(poi, months)
+
+
+def _is_open_window(poi: Dict[str, Any], day_start_min: int, day_end_min: int) -> bool:
+    """is_open_for_day against a day window already converted to minutes."""
+    if not poi.get("opening_hours", {}):
         return True  # No opening hours data, be lenient
     
-    day_start = day_slot.get("start", "08:00")
-    day_end = day_slot.get("end", "20:00")
-    
-    # Convert time strings to minutes since midnight
-    def time_to_minutes(time_str: str) -> int:
-        try:
-            hour, minute = map(int, time_str.split(":"))
-            return hour * 60 + minute
-        except:
-            return 0
-    
-    day_start_min = time_to_minutes(day_start)
-    day_end_min = time_to_minutes(day_end)
-    
-    # Check each day of the week for overlap
-    for day_name in ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]:
-        day_hours = opening_hours.get(day_name, [])
-        if not day_hours:
-            continue
-        
-        for period in day_hours:
-            open_time = period.get("open", "00:00")
-            close_time = period.get("close", "23:59")
-            
-            open_min = time_to_minutes(open_time)
-            close_min = time_to_minutes(close_time)
-            
-            # Check for overlap
-            if open_min < day_end_min and close_min > day_start_min:
-                return True
+    # Check each opening period across the week for overlap
+    for open_min, close_min in open_periods(poi):
+        if open_min < day_end_min and close_min > day_start_min:
+            return True
     
     return False
 
 
+def is_open_for_day(poi: Dict[str, Any], day_slot: Dict[str, str]) -> bool:
+    """True if any period overlaps day window; if opening_hours missing → be lenient (True)."""
+    day_start_min = hhmm_to_minutes(day_slot.get("start", "08:00"))
+    day_end_min = hhmm_to_minutes(day_slot.get("end", "20:00"))
+    return _is_open_window(poi, day_start_min, day_end_min)
+
+
+def fastest_mode_speed(modes: List[str]) -> float:
+    """Highest heuristic speed (km/h) among modes."""
+    return max(MODE_SPEEDS.get(mode.upper(), DEFAULT_MODE_SPEED) for mode in modes)
+
+
 def precheck_transfer_exceeds(
     poi: Dict[str, Any],
     base_km: float,
@@ -142,26 +184,12 @@ def precheck_transfer_exceeds(
     if not modes:
         return False
 
-    # Speed estimates (km/h)
-    speeds = {
-        "DRIVE": 40.0,
-        "WALK": 4.5,
-        "BIKE": 15.0,
-        "TRANSIT": 25.0,
-    }
-
-    min_duration_minutes = float("inf")
-
-    for mode in modes:
-        speed = speeds.get(mode.upper(), 20.0)  # default speed
-        duration_hours = base_km / speed if speed > 0 else float("inf")
-        duration_minutes = duration_hours * 60
-        min_duration_minutes = min(min_duration_minutes, duration_minutes)
-
     if max_transfer_minutes is None:
         # No constraint → cannot exceed
         return False
 
+    # The fastest mode gives the minimum duration
+    min_duration_minutes = base_km / fastest_mode_speed(modes) * 60
     return min_duration_minutes > float(max_transfer_minutes)
 
 
@@ -211,13 +239,17 @@ def filter_candidates(pois: List[Dict[str, Any]], trip_context: Dict[str, Any],
     max_transfer_minutes = constraints.get("max_transfer_minutes", 120)
     health = preferences.get("health", {"health_load": "moderate"})
     
-    # Get base coordinates for distance calculations
-    base_place_id = trip_context.get("base_place_id")
-    if base_place_id:
-        from .candidates import resolve_base_coords
-        base_coords = resolve_base_coords(base_place_id)
-    else:
-        base_coords = (6.9271, 79.8612)  # Default to Colombo
+    # Resolve the request-wide half of each check once, rather than per POI;
+    # checks that cannot drop anything for this request are skipped outright
+    avoid = avoid_terms(avoid_tags)
+    season_months = range_months(date_range.get("start", ""), date_range.get("end", ""))
+    day_start_min = hhmm_to_minutes(day_template.get("start", "08:00"))
+    day_end_min = hhmm_to_minutes(day_template.get("end", "20:00"))
+    check_transfer = bool(modes) and max_transfer_minutes is not None
+    if check_transfer:
+        speed = fastest_mode_speed(modes)
+        max_minutes = float(max_transfer_minutes)
+    check_safety = health.get("health_load", "moderate") == "low"  # safety_gate only drops for low energy
     
     for poi in pois:
         poi_id = poi.get("poi_id", "")
@@ -228,30 +260,29 @@ def filter_candidates(pois: List[Dict[str, Any]], trip_context: Dict[str, Any],
             continue
         
         # Check avoid tags
-        if avoid_tags:
-            offending_tag = violates_avoid_tags(poi, avoid_tags)
+        if avoid:
+            offending_tag = _violates_avoid_terms(poi, avoid)
             if offending_tag:
                 drop_log.append({"poi_id": poi_id, "reason": f"avoid_tag:{offending_tag}"})
                 continue
         
         # Check seasonality
-        if not in_season(poi, date_range):
+        if not _in_season_months(poi, season_months):
             drop_log.append({"poi_id": poi_id, "reason": "bad_season"})
             continue
         
         # Check if open for the day
-        if not is_open_for_day(poi, day_template):
+        if not _is_open_window(poi, day_start_min, day_end_min):
             drop_log.append({"poi_id": poi_id, "reason": "closed"})
             continue
         
-        # Check transfer time limits
-        distance_km = poi.get("distance_km", 0.0)
-        if precheck_transfer_exceeds(poi, distance_km, max_transfer_minutes, modes):
+        # Check transfer time limits (precheck_transfer_exceeds with the speed resolved)
+        if check_transfer and poi.get("distance_km", 0.0) / speed * 60 > max_minutes:
             drop_log.append({"poi_id": poi_id, "reason": "precheck_transfer_exceeds"})
             continue
         
         # Check safety gate
-        if safety_gate(poi, health):
+        if check_safety and safety_gate(poi, health):
             drop_log.append({"poi_id": poi_id, "reason": "safety_gate"})
             continue
         
@@ -40,17 +40,26 @@ def pack_day(candidates_for_day: List[Dict[str, Any]], day_template: Dict[str, s
     day_start_min = time_to_minutes(day_start)
     day_end_min = time_to_minutes(day_end)
     
-    # Sort locks by start time
-    sorted_locks = sorted(locks, key=lambda x: time_to_minutes(x.get("start", "08:00")))
+    # Parse each lock's times once: (start_min, end_min, lock), sorted by start time
+    lock_spans = sorted(
+        ((time_to_minutes(lock.get("start", "08:00")), time_to_minutes(lock.get("end", "08:00")), lock) for lock in locks),
+        key=lambda span: span[0],
+    )
+    # First lock (in given order; the sort is stable) at each start minute,
+    # and first candidate per poi_id
+    lock_at_start: Dict[int, Dict[str, Any]] = {}
+    for lock_start, _, lock in lock_spans:
+        lock_at_start.setdefault(lock_start, lock)
+    first_candidate: Dict[Any, Dict[str, Any]] = {}
+    if locks:
+        for candidate in candidates_for_day:
+            first_candidate.setdefault(candidate.get("poi_id"), candidate)
     
     # Create a list of available time slots
     available_slots = []
     current_time = day_start_min
     
-    for lock in sorted_locks:
-        lock_start = time_to_minutes(lock.get("start", "08:00"))
-        lock_end = time_to_minutes(lock.get("end", "08:00"))
-        
+    for lock_start, lock_end, _ in lock_spans:
         # Add slot before lock if there's time
         if lock_start > current_time:
             available_slots.append((current_time, lock_start))
@@ -71,26 +80,28 @@ def pack_day(candidates_for_day: List[Dict[str, Any]], day_template: Dict[str, s
     for lock in locks:
         used_pois.add(lock.get("poi_id"))
     
+    # Open slots take the highest opening_align candidate that fits (earliest on
+    # ties, and only above -1). Ordering the pool once lets each pick stop at the
+    # first fitting candidate instead of rescanning every candidate per pick
+    pick_order = sorted(
+        (c for c in candidates_for_day if c.get("opening_align", 0.0) > -1),
+        key=lambda c: -c.get("opening_align", 0.0),
+    )
+    
     for slot_start, slot_end in available_slots:
         slot_duration = slot_end - slot_start
         current_slot_time = slot_start
         
         # Check if this is a locked slot
-        is_locked_slot = False
+        lock = lock_at_start.get(slot_start)
+        is_locked_slot = lock is not None
         locked_activity = None
-        for lock in locks:
-            lock_start = time_to_minutes(lock.get("start", "08:00"))
-            if slot_start == lock_start:
-                is_locked_slot = True
-                # Find the locked activity in candidates
-                for candidate in candidates_for_day:
-                    if candidate.get("poi_id") == lock.get("poi_id"):
-                        locked_activity = candidate
-                        break
-                # Mark this POI as used so it won't be scheduled again
-                if locked_activity:
-                    used_pois.add(locked_activity.get("poi_id"))
-                break
+        if is_locked_slot:
+            # Find the locked activity in candidates
+            locked_activity = first_candidate.get(lock.get("poi_id"))
+            # Mark this POI as used so it won't be scheduled again
+            if locked_activity:
+                used_pois.add(locked_activity.get("poi_id"))
         
         if is_locked_slot and locked_activity:
             # Add transfer if we're moving to a new POI
@@ -132,24 +143,13 @@ def pack_day(candidates_for_day: List[Dict[str, Any]], day_template: Dict[str, s
             while current_slot_time < slot_end:
                 # Find best activity for remaining time in slot
                 best_activity = None
-                best_score = -1
+                remaining = slot_end - current_slot_time
                 
-                for candidate in candidates_for_day:
-                    duration = candidate.get("duration_minutes", 60)
-                    
-                    # Skip if activity doesn't fit in remaining time
-                    if duration > (slot_end - current_slot_time):
-                        continue
-                    
-                    # Skip if we've already used this POI
-                    if candidate.get("poi_id") in used_pois:
-                        continue
-                    
-                    # Score based on opening alignment and theme overlap
-                    score = candidate.get("opening_align", 0.0)
-                    if score > best_score:
-                        best_score = score
+                for candidate in pick_order:
+                    # Skip if activity doesn't fit in remaining time or the POI is used
+                    if candidate.get("duration_minutes", 60) <= remaining and candidate.get("poi_id") not in used_pois:
                         best_activity = candidate
+                        break
                 
                 if best_activity:
                     # Add transfer if we're moving to a new POI
@@ -195,26 +195,23 @@ def pack_day(candidates_for_day: List[Dict[str, Any]], day_template: Dict[str, s
     
     # Add breaks if needed based on pace
     if pace == "slow" and len(items) > 2:
-        # Add a break after every 2 activities
-        break_items = []
+        # Add a break after every 2 activities, rebuilding the list in one pass
+        with_breaks = []
         for i, item in enumerate(items):
+            with_breaks.append(item)
             if item.get("type") == "activity" and i > 0 and (i + 1) % 3 == 0:
                 # Add break after this activity
                 break_start = time_to_minutes(item.get("end", "12:00"))
                 break_end = break_start + 30  # 30 minute break
                 
                 if break_end <= day_end_min:
-                    break_item = {
+                    with_breaks.append({
                         "type": "break",
                         "start": minutes_to_time(break_start),
                         "end": minutes_to_time(break_end),
                         "title": "Break",
                         "duration_minutes": 30
-                    }
-                    break_items.append((i + 1, break_item))
-        
-        # Insert breaks in reverse order to maintain indices
-        for i, break_item in reversed(break_items):
-            items.insert(i, break_item)
+                    })
+        items = with_breaks
     
     return items
\ No newline at end of file
@@ -8,6 +8,7 @@ from app.api.rerank import router as rerank_router
 from app.api.ai_rerank import router as ai_rerank_router
 
 from app.api.errors import error_response
+from app.api.responses import DefaultJSONResponse
 import uuid
 import time
 import logging
@@ -45,7 +46,7 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, FileResponse
 
-app = FastAPI(title="Exvora Stateless Itinerary API", version="0.1.0")
+app = FastAPI(title="Exvora Stateless Itinerary API", version="0.1.0", default_response_class=DefaultJSONResponse)
 app.add_middleware(RequestIDMiddleware)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 app.include_router(router, prefix="/v1")
@@ -0,0 +1 @@
+# Trained model artifacts and lightweight inference helpers
@@ -0,0 +1,61 @@
+"""
+Batch inference for the linear preference model.
+Scores many candidate POIs at once from the float32 weights exported by
+scripts/train_pref_model.py, without going through sklearn.
+"""
+
+import os
+from typing import Any, Dict, Optional
+import numpy as np
+
+
+WEIGHTS_PATH = os.path.join(os.path.dirname(__file__), "pref_lr_v1.npz")
+
+# Loaded on first use
+_weights: Optional[Dict[str, Any]] = None
+
+
+def load_weights(path: str = WEIGHTS_PATH) -> Dict[str, Any]:
+    """
+    Load exported model weights.
+
+    Returns:
+        Dict with "mean", "inv_scale" and "w" (float32 vectors), "b" (float32 scalar),
+        "feature_names" (column order) and "feature_index" (name -> column)
+    """
+    with np.load(path) as data:
+        feature_names = data["feature_names"]
+        return {
+            "mean": data["mean"].astype(np.float32),
+            "inv_scale": (1.0 / data["scale"]).astype(np.float32),
+            "w": data["w"].astype(np.float32),
+            "b": np.float32(data["b"]),
+            "feature_names": feature_names,
+            "feature_index": {name: i for i, name in enumerate(feature_names.tolist())},
+        }
+
+
+def get_weights() -> Dict[str, Any]:
+    """Get the shared weights, loading them on first use."""
+    global _weights
+    if _weights is None:
+        _weights = load_weights()
+    return _weights
+
+
+def score_batch(X: np.ndarray, weights: Optional[Dict[str, Any]] = None) -> np.ndarray:
+    """
+    Score a batch of candidates in one matrix-vector product.
+
+    Args:
+        X: Feature matrix, one row per POI, columns in the training feature order
+        weights: Weights from load_weights(); defaults to the shared model
+
+    Returns:
+        Preference probabilities in [0, 1], one per row
+    """
+    if weights is None:
+        weights = get_weights()
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    z = ((X - weights["mean"]) * weights["inv_scale"]) @ weights["w"] + weights["b"]
+    return 1.0 / (1.0 + np.exp(-z))
@@ -26,15 +26,23 @@ class GooglePlace:
 class GooglePlacesClient:
     """Google Places API client with free tier optimization"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, limit: int = 256, limit_per_host: int = 32):
         self.api_key = api_key
         self.base_url = "https://maps.googleapis.com/maps/api"
         self.session: Optional[aiohttp.ClientSession] = None
+        # Connection pool bounds for the session
+        self.limit = limit
+        self.limit_per_host = limit_per_host
         self.cache = {}  # Simple in-memory cache
         self.cache_ttl = 3600  # 1 hour cache
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=300
+        )
+        self.session = aiohttp.ClientSession(connector=connector)
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -45,7 +53,7 @@ class GooglePlacesClient:
         """Make API request with caching"""
         
         # Generate cache key
-        cache_key = f"{endpoint}:{str(sorted(params.items()))}"
+        cache_key = (endpoint, tuple(sorted(params.items())))
         
         # Check cache
         if cache_key in self.cache:
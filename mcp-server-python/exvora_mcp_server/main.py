@@ -577,32 +577,29 @@ class ExvoraTravelMCPServer:
         success_count = 0
         error_count = 0
         
+        # Enrich concurrently; the client spaces out the underlying requests
         async with self.tripadvisor_client:
-            for i, poi in enumerate(process_pois, 1):
-                poi_name = poi.get('name', f'POI #{i}')
-                result += f"**{i}/{len(process_pois)}** Processing: {poi_name}... "
-                
-                try:
-                    enriched_poi = await self.tripadvisor_client.enrich_poi_with_tripadvisor(poi)
-                    
-                    if enriched_poi.get('tripadvisor'):
-                        ta_data = enriched_poi['tripadvisor']
-                        result += f"✅ Found! Rating: {ta_data.get('rating', 'N/A')}/5, Reviews: {ta_data.get('num_reviews', 0)}\n"
-                        success_count += 1
-                    else:
-                        result += f"❌ Not found on TripAdvisor\n"
-                        error_count += 1
-                    
-                    enriched_pois.append(enriched_poi)
-                    
-                    # Rate limiting delay
-                    if i < len(process_pois):
-                        await asyncio.sleep(1)
-                        
-                except Exception as e:
-                    result += f"❌ Error: {str(e)}\n"
-                    enriched_pois.append(poi)  # Keep original POI
-                    error_count += 1
+            batch_results = await self.tripadvisor_client.enrich_pois_batch(process_pois)
+        
+        for i, (poi, enriched_poi) in enumerate(zip(process_pois, batch_results), 1):
+            poi_name = poi.get('name', f'POI #{i}')
+            result += f"**{i}/{len(process_pois)}** Processing: {poi_name}... "
+            
+            if isinstance(enriched_poi, Exception):
+                result += f"❌ Error: {str(enriched_poi)}\n"
+                enriched_pois.append(poi)  # Keep original POI
+                error_count += 1
+                continue
+            
+            if enriched_poi.get('tripadvisor'):
+                ta_data = enriched_poi['tripadvisor']
+                result += f"✅ Found! Rating: {ta_data.get('rating', 'N/A')}/5, Reviews: {ta_data.get('num_reviews', 0)}\n"
+                success_count += 1
+            else:
+                result += f"❌ Not found on TripAdvisor\n"
+                error_count += 1
+            
+            enriched_pois.append(enriched_poi)
         
         # Save results if requested
         if save_results and success_count > 0:
@@ -878,13 +875,21 @@ class ExvoraTravelMCPServer:
         async with self.google_places_client:
             return await self.google_places_client.get_poi_reviews_summary(poi, limit)
 
+    async def aclose(self):
+        """Close HTTP sessions held by the external API clients"""
+        if self.tripadvisor_client:
+            await self.tripadvisor_client.aclose()
+
     async def run(self):
-        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                NotificationOptions()
-            )
+        try:
+            async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    NotificationOptions()
+                )
+        finally:
+            await self.aclose()
 
 
 def main():
@@ -1,28 +1,213 @@
 """POI Management functionality for Exvora MCP Server"""
 
 import json
+import mmap
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import csv
 import io
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+# Datasets at least this large are memory-mapped instead of read into a buffer
+_MMAP_THRESHOLD = 256 * 1024
+
+
+def _parse_json_file(path: Path) -> Any:
+    """Parse a JSON file, memory-mapping large files to avoid a full read copy"""
+    with open(path, 'rb') as f:
+        if path.stat().st_size < _MMAP_THRESHOLD:
+            raw = f.read()
+            return orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if not HAS_ORJSON:
+                return json.loads(bytes(mm))
+            # The view must be released before the map is closed
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+def _format_poi_md_short(poi: Dict[str, Any]) -> str:
+    """Format the short markdown block used in search results for a POI"""
+    return (
+        f"**{poi.get('name', 'Unknown')}** ({poi.get('poi_id', 'No ID')})\n"
+        f"- Themes: {', '.join(poi.get('themes', []))}\n"
+        f"- Tags: {', '.join(poi.get('tags', []))}\n"
+        f"- Price: {poi.get('price_band', 'N/A')} ({poi.get('estimated_cost', 0)} LKR)\n"
+        f"- Duration: {poi.get('duration_minutes', 'N/A')} minutes\n"
+        f"- Region: {poi.get('region', 'N/A')}\n\n"
+    )
+
+
+def _build_region_index(pois: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """Group POI indices by lower-cased region name"""
+    index: Dict[str, List[int]] = {}
+    for i, poi in enumerate(pois):
+        index.setdefault((poi.get('region') or '').lower(), []).append(i)
+    return index
+
+
+# Exports above this many POIs are split across worker threads
+_PARALLEL_EXPORT_THRESHOLD = 5000
+_EXPORT_WORKERS = 4
+
+_CSV_HEADER = [
+    'poi_id', 'name', 'lat', 'lng', 'themes', 'tags',
+    'price_band', 'estimated_cost', 'duration_minutes', 'region'
+]
+
+
+def _matches_export_filter(poi: Dict[str, Any], filter: Dict[str, Any]) -> bool:
+    """Check a POI against the export_data filter"""
+    # Theme filter
+    if 'themes' in filter:
+        poi_themes = poi.get('themes', [])
+        if not any(theme in poi_themes for theme in filter['themes']):
+            return False
+    
+    # Price band filter
+    if 'price_band' in filter and poi.get('price_band') != filter['price_band']:
+        return False
+    
+    # Region filter
+    if 'region' in filter and poi.get('region') != filter['region']:
+        return False
+    
+    return True
+
+
+def _csv_row(poi: Dict[str, Any]) -> List[Any]:
+    """Build the CSV export row for a POI"""
+    coords = poi.get('coords', {})
+    return [
+        poi.get('poi_id', ''),
+        poi.get('name', ''),
+        coords.get('lat', ''),
+        coords.get('lng', ''),
+        ';'.join(poi.get('themes', [])),
+        ';'.join(poi.get('tags', [])),
+        poi.get('price_band', ''),
+        poi.get('estimated_cost', 0),
+        poi.get('duration_minutes', ''),
+        poi.get('region', '')
+    ]
+
+
+def _geojson_feature(poi: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Build the GeoJSON feature for a POI, or None if it has no coordinates"""
+    coords = poi.get('coords', {})
+    if not (coords.get('lat') and coords.get('lng')):
+        return None
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "Point",
+            "coordinates": [coords['lng'], coords['lat']]
+        },
+        "properties": {
+            "poi_id": poi.get('poi_id'),
+            "name": poi.get('name'),
+            "themes": poi.get('themes', []),
+            "tags": poi.get('tags', []),
+            "price_band": poi.get('price_band'),
+            "estimated_cost": poi.get('estimated_cost'),
+            "duration_minutes": poi.get('duration_minutes'),
+            "region": poi.get('region')
+        }
+    }
+
+
+def _export_chunk(
+    pois: List[Dict[str, Any]],
+    format: str,
+    filter: Optional[Dict[str, Any]]
+) -> Tuple[int, List[Any]]:
+    """Filter a slice of POIs and build its export items.
+
+    Returns the number of POIs that passed the filter and the items to write:
+    CSV rows, GeoJSON features, or the POIs themselves for JSON.
+    """
+    if filter:
+        pois = [poi for poi in pois if _matches_export_filter(poi, filter)]
+    
+    if format == "csv":
+        return len(pois), [_csv_row(poi) for poi in pois]
+    if format == "geojson":
+        features = (_geojson_feature(poi) for poi in pois)
+        return len(pois), [f for f in features if f is not None]
+    return len(pois), pois
+
+
+def _dumps_pretty(data: Any) -> str:
+    """Serialize export data as indented JSON"""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(data, indent=2, ensure_ascii=False)
 
 
 class POIManager:
     def __init__(self, data_path: Path):
         self.data_path = data_path
         self.pois_file = data_path / "pois.sample.json"
+        # Parsed dataset cache, keyed on the file's mtime
+        self._pois: Optional[List[Dict[str, Any]]] = None
+        self._pois_mtime: Optional[int] = None
+        # Bumped on every fresh parse so dependents can memoize per snapshot
+        self._cache_version = 0
+        # Markdown snippets parallel to self._pois, built once per load
+        self._md_short: List[str] = []
+        # Lower-cased region -> indices into self._pois, in dataset order
+        self._region_index: Dict[str, List[int]] = {}
 
     async def load_pois(self) -> List[Dict[str, Any]]:
         """Load POIs from the dataset file"""
         try:
-            with open(self.pois_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return data if isinstance(data, list) else []
+            mtime = self.pois_file.stat().st_mtime_ns
+            if self._pois is not None and mtime == self._pois_mtime:
+                return self._pois
+
+            data = _parse_json_file(self.pois_file)
+            pois = data if isinstance(data, list) else []
+
+            self._pois = pois
+            self._pois_mtime = mtime
+            self._cache_version += 1
+            self._md_short = [_format_poi_md_short(poi) for poi in pois]
+            self._region_index = _build_region_index(pois)
+            return pois
         except FileNotFoundError:
             raise FileNotFoundError(f"POI dataset not found at {self.pois_file}")
         except Exception as e:
             raise Exception(f"Failed to load POI data: {str(e)}")
 
+    def _invalidate_cache(self) -> None:
+        """Drop the parsed dataset so the next load re-reads the file"""
+        self._pois = None
+        self._pois_mtime = None
+        self._md_short = []
+        self._region_index = {}
+
+    def find_by_region(
+        self, pois: List[Dict[str, Any]], region: str
+    ) -> List[Dict[str, Any]]:
+        """Return POIs whose region contains `region` (case-insensitive)"""
+        region_lc = region.lower()
+        
+        # Only the cached dataset has an index; anything else is scanned
+        if pois is not self._pois:
+            return [poi for poi in pois if region_lc in (poi.get('region') or '').lower()]
+        
+        # Substring match against the (small) set of distinct region names
+        buckets = [bucket for name, bucket in self._region_index.items() if region_lc in name]
+        if len(buckets) == 1:
+            return [pois[i] for i in buckets[0]]
+        return [pois[i] for i in sorted(i for bucket in buckets for i in bucket)]
+
     async def save_pois(self, pois: List[Dict[str, Any]]) -> None:
         """Save POIs to the dataset file"""
         try:
@@ -30,6 +215,8 @@ class POIManager:
                 json.dump(pois, f, indent=2, ensure_ascii=False)
         except Exception as e:
             raise Exception(f"Failed to save POI data: {str(e)}")
+        finally:
+            self._invalidate_cache()
 
     async def search_pois(
         self,
@@ -44,7 +231,7 @@ class POIManager:
         pois = await self.load_pois()
         
         filtered = []
-        for poi in pois:
+        for poi, md_short in zip(pois, self._md_short):
             # Theme filtering
             if themes:
                 poi_themes = poi.get('themes', [])
@@ -71,23 +258,19 @@ class POIManager:
             if max_cost and poi.get('estimated_cost', 0) > max_cost:
                 continue
             
-            filtered.append(poi)
+            filtered.append(md_short)
+            # Filters are order-preserving, so stop once the page is full
+            if 0 < limit <= len(filtered):
+                break
         
         # Limit results
         filtered = filtered[:limit]
         
         # Format response
-        result = f"Found {len(filtered)} POIs matching your criteria:\n\n"
-        
-        for poi in filtered:
-            result += f"**{poi.get('name', 'Unknown')}** ({poi.get('poi_id', 'No ID')})\n"
-            result += f"- Themes: {', '.join(poi.get('themes', []))}\n"
-            result += f"- Tags: {', '.join(poi.get('tags', []))}\n"
-            result += f"- Price: {poi.get('price_band', 'N/A')} ({poi.get('estimated_cost', 0)} LKR)\n"
-            result += f"- Duration: {poi.get('duration_minutes', 'N/A')} minutes\n"
-            result += f"- Region: {poi.get('region', 'N/A')}\n\n"
+        parts = [f"Found {len(filtered)} POIs matching your criteria:\n\n"]
+        parts.extend(filtered)
         
-        return result
+        return ''.join(parts)
 
     async def get_poi_details(self, poi_id: str, place_id: Optional[str] = None) -> str:
         """Get detailed information about a specific POI"""
@@ -195,90 +378,38 @@ class POIManager:
         """Export POI data in various formats"""
         pois = await self.load_pois()
         
-        # Apply filters if provided
-        if filter:
-            filtered_pois = []
-            for poi in pois:
-                # Theme filter
-                if 'themes' in filter:
-                    poi_themes = poi.get('themes', [])
-                    if not any(theme in poi_themes for theme in filter['themes']):
-                        continue
-                
-                # Price band filter
-                if 'price_band' in filter and poi.get('price_band') != filter['price_band']:
-                    continue
-                
-                # Region filter
-                if 'region' in filter and poi.get('region') != filter['region']:
-                    continue
-                
-                filtered_pois.append(poi)
-            pois = filtered_pois
+        # Filter and build rows/features, fanning out over threads for big datasets
+        if len(pois) > _PARALLEL_EXPORT_THRESHOLD:
+            size = -(-len(pois) // _EXPORT_WORKERS)
+            chunks = [pois[i:i + size] for i in range(0, len(pois), size)]
+            with ThreadPoolExecutor(max_workers=_EXPORT_WORKERS) as executor:
+                results = list(executor.map(lambda c: _export_chunk(c, format, filter), chunks))
+        else:
+            results = [_export_chunk(pois, format, filter)]
+        
+        record_count = sum(count for count, _ in results)
+        items = [item for _, chunk_items in results for item in chunk_items]
         
         # Generate export data
         if format == "csv":
             output = io.StringIO()
             writer = csv.writer(output)
-            
-            # CSV Header
-            writer.writerow([
-                'poi_id', 'name', 'lat', 'lng', 'themes', 'tags', 
-                'price_band', 'estimated_cost', 'duration_minutes', 'region'
-            ])
-            
-            # CSV Rows
-            for poi in pois:
-                coords = poi.get('coords', {})
-                writer.writerow([
-                    poi.get('poi_id', ''),
-                    poi.get('name', ''),
-                    coords.get('lat', ''),
-                    coords.get('lng', ''),
-                    ';'.join(poi.get('themes', [])),
-                    ';'.join(poi.get('tags', [])),
-                    poi.get('price_band', ''),
-                    poi.get('estimated_cost', 0),
-                    poi.get('duration_minutes', ''),
-                    poi.get('region', '')
-                ])
+            writer.writerow(_CSV_HEADER)
+            writer.writerows(items)
             
             export_data = output.getvalue()
             filename = 'pois_export.csv'
             
         elif format == "geojson":
-            features = []
-            for poi in pois:
-                coords = poi.get('coords', {})
-                if coords.get('lat') and coords.get('lng'):
-                    feature = {
-                        "type": "Feature",
-                        "geometry": {
-                            "type": "Point",
-                            "coordinates": [coords['lng'], coords['lat']]
-                        },
-                        "properties": {
-                            "poi_id": poi.get('poi_id'),
-                            "name": poi.get('name'),
-                            "themes": poi.get('themes', []),
-                            "tags": poi.get('tags', []),
-                            "price_band": poi.get('price_band'),
-                            "estimated_cost": poi.get('estimated_cost'),
-                            "duration_minutes": poi.get('duration_minutes'),
-                            "region": poi.get('region')
-                        }
-                    }
-                    features.append(feature)
-            
             geojson_data = {
                 "type": "FeatureCollection",
-                "features": features
+                "features": items
             }
-            export_data = json.dumps(geojson_data, indent=2, ensure_ascii=False)
+            export_data = _dumps_pretty(geojson_data)
             filename = 'pois_export.geojson'
             
         else:  # JSON format
-            export_data = json.dumps(pois, indent=2, ensure_ascii=False)
+            export_data = _dumps_pretty(items)
             filename = 'pois_export.json'
         
         # Save to file
@@ -290,7 +421,7 @@ class POIManager:
         
         result = f"✅ **Data Export Complete**\n\n"
         result += f"- **Format:** {format.upper()}\n"
-        result += f"- **Records:** {len(pois)} POIs\n"
+        result += f"- **Records:** {record_count} POIs\n"
         result += f"- **File:** {filename}\n"
         result += f"- **Location:** {export_path}\n\n"
         result += f"**Preview:**\n```{format}\n{export_data[:500]}{'...' if len(export_data) > 500 else ''}\n```"
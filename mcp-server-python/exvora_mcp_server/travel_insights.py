@@ -1,12 +1,67 @@
 """Travel Insights functionality for Exvora MCP Server"""
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from collections import Counter
+from functools import lru_cache
+import heapq
+
+
+@lru_cache(maxsize=16)
+def _seasonal_insights(season: str) -> str:
+    """Seasonal travel recommendations; a pure function of the season string"""
+    
+    insights = f"## 🌤️ {season.title()} Season Tips\n"
+    
+    season_lower = season.lower()
+    
+    if 'dry' in season_lower or 'peak' in season_lower:
+        insights += "**Best Time for:**\n"
+        insights += "- 🏖️ Beach destinations (West & South coast)\n"
+        insights += "- 🥾 Hiking and trekking activities\n"
+        insights += "- 🏛️ Cultural site visits (comfortable weather)\n"
+        insights += "- 📸 Photography (clear skies)\n\n"
+        
+        insights += "**Recommendations:**\n"
+        insights += "- Book accommodations early (peak season)\n"
+        insights += "- Consider early morning starts for popular sites\n"
+        insights += "- Pack sunscreen and light, breathable clothing\n"
+        insights += "- Perfect for outdoor adventures and water activities\n\n"
+        
+    elif 'wet' in season_lower or 'monsoon' in season_lower:
+        insights += "**Best Time for:**\n"
+        insights += "- 🏔️ Hill country experiences (Kandy, Ella, Nuwara Eliya)\n"
+        insights += "- 🏛️ Indoor cultural activities and museums\n"
+        insights += "- 🍵 Tea plantation tours\n"
+        insights += "- 🏖️ East coast beaches (Arugam Bay, Trincomalee)\n\n"
+        
+        insights += "**Recommendations:**\n"
+        insights += "- Pack waterproof gear and umbrella\n"
+        insights += "- Focus on covered attractions and indoor experiences\n"
+        insights += "- Great for fewer crowds and lower prices\n"
+        insights += "- Lush green landscapes - excellent for nature photography\n\n"
+        
+    else:
+        insights += "**General Seasonal Advice:**\n"
+        insights += "- Check local weather forecasts before traveling\n"
+        insights += "- Sri Lanka has micro-climates - weather varies by region\n"
+        insights += "- Shoulder seasons often offer the best balance of weather and prices\n\n"
+    
+    return insights
+
+
+def _matches_interest(poi: Dict[str, Any], interest_lc: str) -> bool:
+    """Check whether a lower-cased interest appears in a POI's themes or tags"""
+    return (
+        any(interest_lc in theme.lower() for theme in poi.get('themes', []))
+        or any(interest_lc in tag.lower() for tag in poi.get('tags', []))
+    )
 
 
 class TravelInsights:
     def __init__(self, poi_manager):
         self.poi_manager = poi_manager
+        # (dataset version, rendered text) for _get_general_recommendations
+        self._general_cache: Optional[Tuple[int, str]] = None
 
     async def get_insights(
         self,
@@ -47,10 +102,7 @@ class TravelInsights:
         """Generate insights for a specific region"""
         
         # Filter POIs by region
-        regional_pois = [
-            poi for poi in pois 
-            if poi.get('region', '').lower().find(region.lower()) != -1
-        ]
+        regional_pois = self.poi_manager.find_by_region(pois, region)
         
         if not regional_pois:
             return f"## 📍 {region} Region\n❗ No POIs found for this region in our dataset.\n\n"
@@ -103,44 +155,7 @@ class TravelInsights:
 
     def _get_seasonal_insights(self, season: str) -> str:
         """Generate seasonal travel recommendations"""
-        
-        insights = f"## 🌤️ {season.title()} Season Tips\n"
-        
-        season_lower = season.lower()
-        
-        if 'dry' in season_lower or 'peak' in season_lower:
-            insights += "**Best Time for:**\n"
-            insights += "- 🏖️ Beach destinations (West & South coast)\n"
-            insights += "- 🥾 Hiking and trekking activities\n"
-            insights += "- 🏛️ Cultural site visits (comfortable weather)\n"
-            insights += "- 📸 Photography (clear skies)\n\n"
-            
-            insights += "**Recommendations:**\n"
-            insights += "- Book accommodations early (peak season)\n"
-            insights += "- Consider early morning starts for popular sites\n"
-            insights += "- Pack sunscreen and light, breathable clothing\n"
-            insights += "- Perfect for outdoor adventures and water activities\n\n"
-            
-        elif 'wet' in season_lower or 'monsoon' in season_lower:
-            insights += "**Best Time for:**\n"
-            insights += "- 🏔️ Hill country experiences (Kandy, Ella, Nuwara Eliya)\n"
-            insights += "- 🏛️ Indoor cultural activities and museums\n"
-            insights += "- 🍵 Tea plantation tours\n"
-            insights += "- 🏖️ East coast beaches (Arugam Bay, Trincomalee)\n\n"
-            
-            insights += "**Recommendations:**\n"
-            insights += "- Pack waterproof gear and umbrella\n"
-            insights += "- Focus on covered attractions and indoor experiences\n"
-            insights += "- Great for fewer crowds and lower prices\n"
-            insights += "- Lush green landscapes - excellent for nature photography\n\n"
-            
-        else:
-            insights += "**General Seasonal Advice:**\n"
-            insights += "- Check local weather forecasts before traveling\n"
-            insights += "- Sri Lanka has micro-climates - weather varies by region\n"
-            insights += "- Shoulder seasons often offer the best balance of weather and prices\n\n"
-        
-        return insights
+        return _seasonal_insights(season)
 
     async def _get_budget_insights(self, pois: List[Dict[str, Any]], budget_range: str) -> str:
         """Generate budget-specific recommendations"""
@@ -217,42 +232,37 @@ class TravelInsights:
         insights = f"## 🎯 Based on Your Interests\n"
         
         for interest in interests:
-            # Find POIs matching this interest
-            matching_pois = []
+            interest_lc = interest.lower()
+            
+            # First pass: aggregate stats without materializing the matches
+            match_count = 0
+            total_cost = 0
+            regions = Counter()
             for poi in pois:
-                # Check themes
-                themes_match = any(
-                    interest.lower() in theme.lower() 
-                    for theme in poi.get('themes', [])
-                )
-                # Check tags
-                tags_match = any(
-                    interest.lower() in tag.lower() 
-                    for tag in poi.get('tags', [])
-                )
-                
-                if themes_match or tags_match:
-                    matching_pois.append(poi)
+                if not _matches_interest(poi, interest_lc):
+                    continue
+                match_count += 1
+                total_cost += poi.get('estimated_cost', 0)
+                if poi.get('region'):
+                    regions[poi['region']] += 1
             
-            if matching_pois:
+            if match_count:
                 insights += f"\n### {interest.title()}\n"
-                insights += f"- **{len(matching_pois)} relevant POIs** available\n"
+                insights += f"- **{match_count} relevant POIs** available\n"
                 
-                # Top recommendations (sort by cost, take 3)
-                top_pois = sorted(matching_pois, key=lambda x: x.get('estimated_cost', 0))[:3]
+                # Second pass: top recommendations (cheapest 3, stable order)
+                top_pois = heapq.nsmallest(
+                    3,
+                    (poi for poi in pois if _matches_interest(poi, interest_lc)),
+                    key=lambda x: x.get('estimated_cost', 0)
+                )
                 insights += f"- **Top Recommendations:** {', '.join([poi.get('name', 'Unknown') for poi in top_pois])}\n"
                 
                 # Average cost for this interest
-                costs = [poi.get('estimated_cost', 0) for poi in matching_pois]
-                avg_cost = sum(costs) / len(costs) if costs else 0
+                avg_cost = total_cost / match_count
                 insights += f"- **Average Cost:** {avg_cost:.0f} LKR\n"
                 
-                # Best regions for this interest
-                regions = Counter()
-                for poi in matching_pois:
-                    if poi.get('region'):
-                        regions[poi['region']] += 1
-                
+                # Best region for this interest
                 if regions:
                     top_region = regions.most_common(1)[0]
                     insights += f"- **Best Region:** {top_region[0]} ({top_region[1]} options)\n"
@@ -262,6 +272,21 @@ class TravelInsights:
     def _get_general_recommendations(self, pois: List[Dict[str, Any]]) -> str:
         """Generate general travel recommendations for Sri Lanka"""
         
+        # The output only depends on the dataset snapshot, so reuse it until
+        # the POI manager reloads
+        version = getattr(self.poi_manager, '_cache_version', None)
+        cached = self._general_cache
+        if version is not None and cached is not None and cached[0] == version:
+            return cached[1]
+        
+        insights = self._build_general_recommendations(pois)
+        if version is not None:
+            self._general_cache = (version, insights)
+        return insights
+
+    def _build_general_recommendations(self, pois: List[Dict[str, Any]]) -> str:
+        """Render the general recommendations section from the dataset"""
+        
         # Analyze dataset for general insights
         total_pois = len(pois)
         themes = Counter()
@@ -1,14 +1,61 @@
 """TripAdvisor API client for Exvora MCP Server"""
 
 import asyncio
-import json
-from typing import Any, Dict, List, Optional
+import logging
+import random
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
 import aiohttp
+from aiolimiter import AsyncLimiter
+from cachetools import TTLCache
 from dataclasses import dataclass
-import time
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
 
-@dataclass
+try:
+    import ijson
+    HAS_IJSON = True
+except Exception:
+    HAS_IJSON = False
+
+logger = logging.getLogger(__name__)
+
+# Address components joined, in order, into TripAdvisorLocation.address
+_ADDR_FIELDS = ('street1', 'street2', 'city', 'state', 'country')
+# Photo sizes in order of preference
+_PHOTO_SIZES = ('large', 'medium', 'small')
+# Fields emitted in the enriched POI; a search match carrying all of them
+# needs no details lookup
+_ENRICH_FIELDS = (
+    'rating', 'ranking', 'price_level', 'description', 'photo_url',
+    'amenities', 'website', 'phone'
+)
+# Session-wide defaults so a stalled upstream cannot hold a request forever
+_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3)
+_HEADERS = {'Accept': 'application/json'}
+# Marks a POI that has not been looked up yet (None means "no match")
+_MISSING = object()
+
+
+async def _read_json(response: aiohttp.ClientResponse, data_limit: Optional[int] = None) -> Any:
+    """Decode a JSON response body, using orjson when available.
+
+    With data_limit and ijson available, only the first data_limit entries
+    of the top-level 'data' array are parsed; the rest of the body is skipped.
+    """
+    if data_limit is not None and HAS_IJSON:
+        items = ijson.items(await response.read(), 'data.item', use_float=True)
+        return {'data': list(islice(items, data_limit))}
+    if HAS_ORJSON:
+        return orjson.loads(await response.read())
+    return await response.json()
+
+
+@dataclass(slots=True, frozen=True)
 class TripAdvisorLocation:
     location_id: str
     name: str
@@ -21,79 +68,134 @@ class TripAdvisorLocation:
     website: Optional[str]
     description: Optional[str]
     photo_url: Optional[str]
-    amenities: List[str]
+    amenities: Tuple[str, ...]  # a tuple, so frozen instances stay hashable
+
+
+@dataclass(slots=True, frozen=True)
+class TripAdvisorReview:
+    id: Optional[int]
+    rating: Optional[int]
+    title: str
+    text: str
+    published_date: Optional[str]
+    username: str
+    user_location: str
+    helpful_votes: int
+    language: str
+    url: str
 
 
 class TripAdvisorClient:
     """TripAdvisor Content API client with rate limiting and caching"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, limit: int = 256, limit_per_host: int = 32):
         self.api_key = api_key
         self.base_url = "https://api.content.tripadvisor.com/api/v1"
         self.session: Optional[aiohttp.ClientSession] = None
-        self.rate_limit_delay = 1.0  # Seconds between requests
-        self.last_request_time = 0
-        self.cache = {}  # Simple in-memory cache
+        # Connection pool bounds for the shared session
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        # Query parameters sent with every request; per-call params are
+        # merged over these so the caller's dict is never mutated
+        self._default_params = {'key': api_key, 'language': 'en'}
+        # Token bucket shared by all concurrent calls: up to 5 requests/second
+        self.limiter = AsyncLimiter(max_rate=5, time_period=1.0)
         self.cache_ttl = 3600  # 1 hour cache
+        # Bounded so keys that are never requested again cannot pile up
+        self.cache = TTLCache(maxsize=1024, ttl=self.cache_ttl)
+        # Best search match per POI, or None when TripAdvisor has no match;
+        # kept for a day since matches rarely change
+        self.poi_match_cache = TTLCache(maxsize=4096, ttl=86400)
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        # Reuse one session, and its keep-alive connection pool, across
+        # 'async with' blocks; it is only closed by aclose()
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=_TIMEOUT,
+                headers=_HEADERS
+            )
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        # The session outlives the context block; see aclose()
+        pass
+
+    async def aclose(self):
+        """Close the underlying HTTP session"""
+        if self.session and not self.session.closed:
             await self.session.close()
+        self.session = None
 
-    async def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    async def _make_request(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        data_limit: Optional[int] = None
+    ) -> Dict[str, Any]:
         """Make rate-limited API request with caching"""
         
-        # Generate cache key
-        cache_key = f"{endpoint}:{json.dumps(params, sort_keys=True)}"
-        
-        # Check cache
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_ttl:
-                return cached_data
+        # Generate cache key (the API key and defaults are the same for every call)
+        cache_key = (endpoint, tuple(sorted(params.items())) if params else (), data_limit)
         
-        # Rate limiting
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.rate_limit_delay:
-            await asyncio.sleep(self.rate_limit_delay - elapsed)
+        # Check cache (expired entries are evicted by the TTLCache itself)
+        cached_data = self.cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
         
-        # Add API key to params
-        params['key'] = self.api_key
+        if params:
+            params = {**self._default_params, **params}
+        else:
+            params = self._default_params
         
-        url = f"{self.base_url}{endpoint}"
+        url = self.base_url + endpoint
         
         if not self.session:
             raise RuntimeError("TripAdvisor client not initialized. Use 'async with' context.")
         
-        try:
-            async with self.session.get(url, params=params) as response:
-                self.last_request_time = time.time()
-                
-                if response.status == 200:
-                    data = await response.json()
-                    # Cache successful response
-                    self.cache[cache_key] = (data, time.time())
-                    return data
-                elif response.status == 429:
-                    # Rate limited - wait and retry once
-                    await asyncio.sleep(5)
-                    async with self.session.get(url, params=params) as retry_response:
-                        if retry_response.status == 200:
-                            data = await retry_response.json()
-                            self.cache[cache_key] = (data, time.time())
-                            return data
-                        else:
-                            raise Exception(f"TripAdvisor API error after retry: {retry_response.status}")
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"TripAdvisor API error {response.status}: {error_text}")
+        for attempt in range(2):
+            try:
+                data = await self._fetch(url, params, data_limit)
+                break
+            except asyncio.TimeoutError:
+                if attempt:
+                    raise Exception("TripAdvisor API request timed out")
+                # Timed out - retry once after a short, jittered pause
+                await asyncio.sleep(0.5 + random.random() * 0.5)
+            except aiohttp.ClientError as e:
+                raise Exception(f"TripAdvisor API connection error: {str(e)}")
         
-        except aiohttp.ClientError as e:
-            raise Exception(f"TripAdvisor API connection error: {str(e)}")
+        # Cache successful response
+        self.cache[cache_key] = data
+        return data
+
+    async def _fetch(
+        self, url: str, params: Dict[str, Any], data_limit: Optional[int]
+    ) -> Dict[str, Any]:
+        """Issue one rate-limited GET, retrying once if rate limited"""
+        await self.limiter.acquire()
+        async with self.session.get(url, params=params) as response:
+            if response.status == 200:
+                return await _read_json(response, data_limit)
+            elif response.status == 429:
+                # Rate limited - wait and retry once
+                await asyncio.sleep(5)
+                await self.limiter.acquire()
+                async with self.session.get(url, params=params) as retry_response:
+                    if retry_response.status == 200:
+                        return await _read_json(retry_response, data_limit)
+                    else:
+                        raise Exception(f"TripAdvisor API error after retry: {retry_response.status}")
+            else:
+                error_text = await response.text()
+                raise Exception(f"TripAdvisor API error {response.status}: {error_text}")
 
     async def search_locations(
         self, 
@@ -106,8 +208,7 @@ class TripAdvisorClient:
         """Search for locations by name and/or coordinates"""
         
         params = {
-            'searchQuery': search_query,
-            'language': 'en'
+            'searchQuery': search_query
         }
         
         # Add location-based search if coordinates provided
@@ -135,12 +236,8 @@ class TripAdvisorClient:
     async def get_location_details(self, location_id: str) -> Optional[TripAdvisorLocation]:
         """Get detailed information about a specific location"""
         
-        params = {
-            'language': 'en'
-        }
-        
         try:
-            response = await self._make_request(f'/location/{location_id}/details', params)
+            response = await self._make_request(f'/location/{location_id}/details')
             
             if 'data' in response:
                 return self._parse_location(response['data'])
@@ -152,12 +249,8 @@ class TripAdvisorClient:
     async def get_location_photos(self, location_id: str, limit: int = 5) -> List[Dict[str, str]]:
         """Get photos for a location"""
         
-        params = {
-            'language': 'en'
-        }
-        
         try:
-            response = await self._make_request(f'/location/{location_id}/photos', params)
+            response = await self._make_request(f'/location/{location_id}/photos')
             
             photos = []
             for photo in response.get('data', [])[:limit]:
@@ -183,40 +276,39 @@ class TripAdvisorClient:
         location_id: str, 
         limit: int = 5,
         sort_order: str = 'most_recent'
-    ) -> List[Dict[str, Any]]:
+    ) -> List[TripAdvisorReview]:
         """Get reviews for a location"""
         
         params = {
-            'language': 'en',
             'sort': sort_order
         }
         
         try:
-            response = await self._make_request(f'/location/{location_id}/reviews', params)
-            
-            reviews = []
-            for review in response.get('data', [])[:limit]:
-                review_data = {
-                    'id': review.get('id'),
-                    'rating': review.get('rating'),
-                    'title': review.get('title', ''),
-                    'text': review.get('text', ''),
-                    'published_date': review.get('published_date'),
-                    'user': {
-                        'username': review.get('user', {}).get('username', 'Anonymous'),
-                        'location': review.get('user', {}).get('user_location', {}).get('name', '')
-                    },
-                    'helpful_votes': review.get('helpful_votes', 0),
-                    'language': review.get('language', 'en'),
-                    'url': review.get('url', '')
-                }
-                reviews.append(review_data)
-            
-            return reviews
+            response = await self._make_request(
+                f'/location/{location_id}/reviews', params, data_limit=limit
+            )
+            
+            return [self._parse_review(review) for review in response.get('data', [])[:limit]]
             
         except Exception as e:
             raise Exception(f"Failed to get TripAdvisor reviews: {str(e)}")
 
+    def _parse_review(self, item: Dict[str, Any]) -> TripAdvisorReview:
+        """Parse a TripAdvisor review into a TripAdvisorReview object"""
+        user = item.get('user') or {}
+        return TripAdvisorReview(
+            id=item.get('id'),
+            rating=item.get('rating'),
+            title=item.get('title', ''),
+            text=item.get('text', ''),
+            published_date=item.get('published_date'),
+            username=user.get('username', 'Anonymous'),
+            user_location=(user.get('user_location') or {}).get('name', ''),
+            helpful_votes=item.get('helpful_votes', 0),
+            language=item.get('language', 'en'),
+            url=item.get('url', '')
+        )
+
     def _parse_location(self, item: Dict[str, Any]) -> Optional[TripAdvisorLocation]:
         """Parse TripAdvisor API response into TripAdvisorLocation object"""
         
@@ -226,30 +318,17 @@ class TripAdvisorClient:
                 return None
             
             # Extract address
-            address_obj = item.get('address_obj', {})
-            address_parts = []
-            for field in ['street1', 'street2', 'city', 'state', 'country']:
-                if address_obj.get(field):
-                    address_parts.append(address_obj[field])
-            address = ', '.join(address_parts)
+            address_obj = item.get('address_obj') or {}
+            address = ', '.join(filter(None, (address_obj.get(f) for f in _ADDR_FIELDS)))
             
             # Extract amenities/features
-            amenities = []
-            if 'amenities' in item:
-                for amenity in item['amenities']:
-                    if amenity.get('name'):
-                        amenities.append(amenity['name'])
-            
-            # Extract photo URL
-            photo_url = None
-            if 'photo' in item and 'images' in item['photo']:
-                images = item['photo']['images']
-                if 'large' in images:
-                    photo_url = images['large']['url']
-                elif 'medium' in images:
-                    photo_url = images['medium']['url']
-                elif 'small' in images:
-                    photo_url = images['small']['url']
+            amenities = tuple(a['name'] for a in item.get('amenities') or () if a.get('name'))
+            
+            # Extract photo URL (largest available size)
+            photo = item.get('photo') or {}
+            images = photo.get('images') or {}
+            size = next((size for size in _PHOTO_SIZES if size in images), None)
+            photo_url = images[size]['url'] if size else None
             
             return TripAdvisorLocation(
                 location_id=location_id,
@@ -267,7 +346,7 @@ class TripAdvisorClient:
             )
             
         except Exception as e:
-            print(f"Error parsing TripAdvisor location: {e}")
+            logger.warning("Error parsing TripAdvisor location: %s", e)
             return None
 
     async def enrich_poi_with_tripadvisor(self, poi: Dict[str, Any]) -> Dict[str, Any]:
@@ -285,22 +364,36 @@ class TripAdvisorClient:
             if not search_query:
                 return enriched_poi
             
-            locations = await self.search_locations(
-                search_query=search_query,
-                lat=lat,
-                lng=lng,
-                radius=5000,  # 5km radius
-                limit=3
-            )
-            
-            if not locations:
+            poi_key = (search_query, round(lat or 0, 3), round(lng or 0, 3))
+            ta_location = self.poi_match_cache.get(poi_key, _MISSING)
+            if ta_location is None:
+                # Known to have no TripAdvisor match
                 return enriched_poi
             
-            # Use the first (most relevant) result
-            ta_location = locations[0]
-            
-            # Get additional details
-            detailed_location = await self.get_location_details(ta_location.location_id)
+            if ta_location is _MISSING:
+                locations = await self.search_locations(
+                    search_query=search_query,
+                    lat=lat,
+                    lng=lng,
+                    radius=5000,  # 5km radius
+                    limit=3
+                )
+                
+                if not locations:
+                    self.poi_match_cache[poi_key] = None
+                    return enriched_poi
+                
+                # Use the first (most relevant) result
+                ta_location = locations[0]
+                self.poi_match_cache[poi_key] = ta_location
+            location_id = ta_location.location_id
+            
+            # Get additional details, unless the search result already
+            # carries every field we emit
+            if all(getattr(ta_location, f) not in (None, '', ()) for f in _ENRICH_FIELDS):
+                detailed_location = None
+            else:
+                detailed_location = await self.get_location_details(location_id)
             if detailed_location:
                 ta_location = detailed_location
             
@@ -313,7 +406,7 @@ class TripAdvisorClient:
                 'price_level': ta_location.price_level,
                 'description': ta_location.description,
                 'photo_url': ta_location.photo_url,
-                'amenities': ta_location.amenities,
+                'amenities': list(ta_location.amenities),
                 'website': ta_location.website,
                 'phone': ta_location.phone
             }
@@ -331,9 +424,37 @@ class TripAdvisorClient:
             
         except Exception as e:
             # Return original POI if enrichment fails
-            print(f"Failed to enrich POI {poi.get('name', 'Unknown')} with TripAdvisor: {e}")
+            logger.warning("Failed to enrich POI %s with TripAdvisor: %s", poi.get('name', 'Unknown'), e)
             return enriched_poi
 
+    async def enrich_pois_batch(
+        self, pois: List[Dict[str, Any]], concurrency: int = 10
+    ) -> List[Any]:
+        """Enrich several POIs concurrently.
+
+        Returns one entry per input POI, in order: the enriched POI, or the
+        exception raised while enriching it.
+        """
+        sem = asyncio.Semaphore(concurrency)
+        if hasattr(asyncio, 'TaskGroup'):
+            # _enrich_one never raises, so one failure cannot cancel the group
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(self._enrich_one(sem, poi)) for poi in pois]
+            return [task.result() for task in tasks]
+        # Python 3.10
+        return await asyncio.gather(*(self._enrich_one(sem, poi) for poi in pois))
+
+    async def _enrich_one(self, sem: asyncio.Semaphore, poi: Dict[str, Any]) -> Any:
+        """Enrich a single POI while holding a slot of the batch semaphore.
+
+        Errors are returned rather than raised.
+        """
+        async with sem:
+            try:
+                return await self.enrich_poi_with_tripadvisor(poi)
+            except Exception as e:
+                return e
+
     async def get_poi_reviews_summary(self, poi: Dict[str, Any], review_limit: int = 10) -> str:
         """Get a formatted summary of reviews for a POI"""
         
@@ -355,38 +476,37 @@ class TripAdvisorClient:
                 return "No reviews available on TripAdvisor."
             
             # Format summary
-            summary = f"# 🌟 TripAdvisor Reviews for {poi.get('name', 'POI')}\n\n"
+            parts = [f"# 🌟 TripAdvisor Reviews for {poi.get('name', 'POI')}\n\n"]
             
             if ta_data.get('rating'):
-                summary += f"**Overall Rating:** {ta_data['rating']}/5 ({ta_data.get('num_reviews', 0)} reviews)\n\n"
+                parts.append(f"**Overall Rating:** {ta_data['rating']}/5 ({ta_data.get('num_reviews', 0)} reviews)\n\n")
             
-            summary += "## Recent Reviews\n\n"
+            parts.append("## Recent Reviews\n\n")
             
             for i, review in enumerate(reviews, 1):
-                summary += f"### Review {i}\n"
-                summary += f"**Rating:** {review['rating']}/5\n"
+                parts.append(f"### Review {i}\n**Rating:** {review.rating}/5\n")
                 
-                if review['title']:
-                    summary += f"**Title:** {review['title']}\n"
+                if review.title:
+                    parts.append(f"**Title:** {review.title}\n")
                 
-                if review['text']:
+                if review.text:
                     # Truncate long reviews
-                    text = review['text'][:300]
-                    if len(review['text']) > 300:
+                    text = review.text[:300]
+                    if len(review.text) > 300:
                         text += "..."
-                    summary += f"**Review:** {text}\n"
+                    parts.append(f"**Review:** {text}\n")
                 
-                summary += f"**Author:** {review['user']['username']}"
-                if review['user']['location']:
-                    summary += f" ({review['user']['location']})"
-                summary += "\n"
+                if review.user_location:
+                    parts.append(f"**Author:** {review.username} ({review.user_location})\n")
+                else:
+                    parts.append(f"**Author:** {review.username}\n")
                 
-                if review['published_date']:
-                    summary += f"**Date:** {review['published_date']}\n"
+                if review.published_date:
+                    parts.append(f"**Date:** {review.published_date}\n")
                 
-                summary += "\n"
+                parts.append("\n")
             
-            return summary
+            return ''.join(parts)
             
         except Exception as e:
             return f"Error retrieving TripAdvisor reviews: {str(e)}"
\ No newline at end of file
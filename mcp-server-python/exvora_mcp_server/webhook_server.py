@@ -13,9 +13,31 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+try:
+    import uvloop  # noqa: F401
+    HAS_UVLOOP = True
+except Exception:
+    HAS_UVLOOP = False
+
+# libuv-based loop where available (not on Windows), stdlib asyncio otherwise
+_LOOP = "uvloop" if HAS_UVLOOP else "asyncio"
+
 from .main import ExvoraTravelMCPServer
 
 
+class ORJSONResponse(JSONResponse):
+    """orjson-rendered JSONResponse, encoding like the main app's response class."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
 class ExvoraWebhookServer:
     def __init__(self):
         self.app = FastAPI(
@@ -23,7 +45,8 @@ class ExvoraWebhookServer:
             description="Travel POI management and analysis webhook API",
             version="1.0.0",
             docs_url="/docs",
-            redoc_url="/redoc"
+            redoc_url="/redoc",
+            default_response_class=ORJSONResponse if HAS_ORJSON else JSONResponse
         )
         
         # Add CORS middleware
@@ -38,6 +61,10 @@ class ExvoraWebhookServer:
         self.mcp_server = ExvoraTravelMCPServer()
         self.setup_webhook_routes()
 
+        @self.app.on_event("shutdown")
+        async def close_clients():
+            await self.mcp_server.aclose()
+
     def setup_webhook_routes(self):
         @self.app.get("/")
         async def root():
@@ -242,14 +269,33 @@ class ExvoraWebhookServer:
                 "version": "1.0.0"
             }
 
-def start_webhook_server(host: str = "0.0.0.0", port: int = 8080):
-    """Start the webhook server"""
-    server = ExvoraWebhookServer()
+def create_app() -> FastAPI:
+    """Build the webhook app; used as the uvicorn factory for worker processes"""
+    return ExvoraWebhookServer().app
+
+def start_webhook_server(host: str = "0.0.0.0", port: int = 8080, workers: int = 0):
+    """Start the webhook server
+
+    With workers > 0 the app is served by that many uvicorn worker
+    processes, each building its own app through create_app().
+    """
     print(f"🌐 Starting Exvora Travel Webhook Server")
     print(f"📡 Server URL: http://{host}:{port}")
     print(f"📚 API Documentation: http://{host}:{port}/docs")
     print(f"🔍 Quick test: http://{host}:{port}/search?themes=Cultural")
-    uvicorn.run(server.app, host=host, port=port)
+    if workers > 0:
+        # Worker processes need an import string rather than an app object
+        uvicorn.run(
+            "exvora_mcp_server.webhook_server:create_app",
+            factory=True,
+            host=host,
+            port=port,
+            workers=workers,
+            loop=_LOOP
+        )
+    else:
+        server = ExvoraWebhookServer()
+        uvicorn.run(server.app, host=host, port=port, loop=_LOOP)
 
 if __name__ == "__main__":
-    start_webhook_server()
\ No newline at end of file
+    start_webhook_server(workers=int(os.getenv("WEBHOOK_WORKERS", "0")))
\ No newline at end of file
@@ -2,6 +2,7 @@
 
 """Setup script for Exvora Travel MCP Server"""
 
+import shlex
 import subprocess
 import sys
 import os
@@ -24,25 +25,34 @@ def main():
     python_version = sys.version_info
     print(f"Python version: {python_version.major}.{python_version.minor}.{python_version.micro}")
     
-    if python_version < (3, 9):
-        print("❌ Python 3.9+ required")
+    if python_version < (3, 10):
+        print("❌ Python 3.10+ required")
         sys.exit(1)
     
     # Install required packages
     packages = [
         "mcp>=1.0.0",
         "aiohttp>=3.8.0", 
+        "aiolimiter>=1.1.0",
+        "cachetools>=5.3.0",
+        "orjson>=3.9.0",
+        "uvicorn>=0.24.0",
+        "httptools>=0.6.0",
         "pydantic>=2.5.0",
         "pandas>=2.0.0",
         "geopy>=2.3.0"
     ]
+    # uvloop is optional and does not support Windows
+    if sys.platform != "win32":
+        packages.append("uvloop>=0.19.0")
     
     print("📦 Installing dependencies...")
-    for package in packages:
-        print(f"  Installing {package}...")
-        if not run_command(f"{sys.executable} -m pip install '{package}'"):
-            print(f"❌ Failed to install {package}")
-            return False
+    print(f"  Installing {', '.join(packages)}...")
+    # One pip run resolves every requirement together
+    requirements = " ".join(shlex.quote(package) for package in packages)
+    if not run_command(f"{shlex.quote(sys.executable)} -m pip install {requirements}"):
+        print("❌ Failed to install dependencies")
+        return False
     
     # Test imports
     print("🧪 Testing imports...")
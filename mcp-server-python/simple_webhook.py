@@ -5,8 +5,9 @@
 import asyncio
 import json
 import sys
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qsl
 from pathlib import Path
 
 # Add the current directory to path for imports
@@ -14,12 +15,166 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from exvora_mcp_server.main import ExvoraTravelMCPServer
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
 
-class ExvoraWebhookHandler(BaseHTTPRequestHandler):
+
+# Shared by every request; its coroutines only ever run on the loop below,
+# so handler threads never touch its state directly
+_MCP = ExvoraTravelMCPServer()
+
+# One event loop, run in a background thread, serves every request; the MCP
+# clients keep their HTTP sessions bound to it between requests
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _run(coro):
+    """Run a coroutine on the shared event loop and wait for its result"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, daemon=True).start()
+                _loop = loop
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+def _encode_json(data, pretty=False):
+    """Serialize a response payload to UTF-8 JSON bytes"""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class _RequestError(Exception):
+    """Raised by a route handler to reply with an error status"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+_ROOT = {
+    "name": "Exvora Travel API",
+    "version": "1.0.0",
+    "description": "Travel POI management and analysis webhook",
+    "endpoints": {
+        "validate": "GET /validate?fix_issues=true",
+        "search": "GET /search?themes=Cultural&price_band=low",
+        "poi": "GET /poi?poi_id=temple_id",
+        "insights": "GET /insights?region=Kandy&season=dry",
+        "health": "GET /health"
+    }
+}
+
+_HEALTH = {
+    "status": "healthy",
+    "service": "Exvora Travel API"
+}
+
+
+def _root(params):
+    return _ROOT
+
+
+def _health(params):
+    return _HEALTH
+
+
+def _validate(params):
+    fix_issues = params.get('fix_issues', 'false').lower() == 'true'
+    result = _run(_MCP.data_validator.validate(fix_issues=fix_issues))
+    return {
+        "success": True,
+        "report": result
+    }
+
+
+def _search(params):
+    args = {"limit": int(params.get('limit', 10))}
+    for key in ('themes', 'tags'):
+        if params.get(key):
+            args[key] = params[key].split(',')
+    for key in ('price_band', 'region'):
+        if params.get(key):
+            args[key] = params[key]
+    
+    result = _run(_MCP.poi_manager.search_pois(**args))
+    return {
+        "success": True,
+        "data": result,
+        "query": args
+    }
+
+
+def _poi(params):
+    poi_id = params.get('poi_id')
+    if not poi_id:
+        raise _RequestError("Missing poi_id parameter")
+    
+    result = _run(_MCP.poi_manager.get_poi_details(poi_id=poi_id))
+    return {
+        "success": True,
+        "poi_id": poi_id,
+        "data": result
+    }
+
+
+def _insights(params):
+    args = {}
+    for key in ('region', 'season', 'budget_range'):
+        if params.get(key):
+            args[key] = params[key]
+    if params.get('interests'):
+        args['interests'] = params['interests'].split(',')
+    
+    result = _run(_MCP.travel_insights.get_insights(**args))
+    return {
+        "success": True,
+        "insights": result
+    }
+
+
+def _analyze(data):
+    itinerary = data.get('itinerary')
+    if not itinerary:
+        raise _RequestError("Missing 'itinerary' in request body")
     
-    def __init__(self, *args, **kwargs):
-        self.mcp_server = ExvoraTravelMCPServer()
-        super().__init__(*args, **kwargs)
+    result = _run(_MCP.itinerary_analyzer.analyze(itinerary=itinerary))
+    return {
+        "success": True,
+        "analysis": result
+    }
+
+
+# Route handlers take the query parameters (GET) or JSON body (POST)
+_ROUTES_GET = {
+    "/": _root,
+    "/health": _health,
+    "/validate": _validate,
+    "/search": _search,
+    "/poi": _poi,
+    "/insights": _insights,
+}
+_ROUTES_POST = {
+    "/analyze": _analyze,
+}
+
+# Constant responses, encoded once; served as-is when there is no query string
+_STATIC_GET = {
+    "/": _encode_json(_ROOT),
+    "/health": _encode_json(_HEALTH),
+}
+
+
+class ExvoraWebhookHandler(BaseHTTPRequestHandler):
     
     def _set_headers(self, status=200):
         self.send_response(status)
@@ -29,165 +184,62 @@ class ExvoraWebhookHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
     
-    def _send_json(self, data, status=200):
+    def _send_json(self, data, status=200, pretty=False):
         self._set_headers(status)
-        self.wfile.write(json.dumps(data, indent=2).encode('utf-8'))
+        self.wfile.write(_encode_json(data, pretty))
     
     def _send_error(self, message, status=500):
         self._send_json({"error": message, "success": False}, status)
     
+    def _dispatch(self, handler, arg, pretty=False):
+        try:
+            self._send_json(handler(arg), pretty=pretty)
+        except _RequestError as e:
+            self._send_error(str(e), e.status)
+        except Exception as e:
+            self._send_error(str(e))
+    
     def do_OPTIONS(self):
         self._set_headers()
     
     def do_GET(self):
-        try:
-            parsed_path = urlparse(self.path)
-            path = parsed_path.path
-            query_params = parse_qs(parsed_path.query)
-            
-            # Convert query params (lists) to single values
-            params = {}
-            for key, values in query_params.items():
-                params[key] = values[0] if values else None
-            
-            if path == "/":
-                self._send_json({
-                    "name": "Exvora Travel API",
-                    "version": "1.0.0",
-                    "description": "Travel POI management and analysis webhook",
-                    "endpoints": {
-                        "validate": "GET /validate?fix_issues=true",
-                        "search": "GET /search?themes=Cultural&price_band=low",
-                        "poi": "GET /poi?poi_id=temple_id",
-                        "insights": "GET /insights?region=Kandy&season=dry",
-                        "health": "GET /health"
-                    }
-                })
-            
-            elif path == "/health":
-                self._send_json({
-                    "status": "healthy",
-                    "service": "Exvora Travel API"
-                })
-            
-            elif path == "/validate":
-                fix_issues = params.get('fix_issues', 'false').lower() == 'true'
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(
-                    self.mcp_server.data_validator.validate(fix_issues=fix_issues)
-                )
-                loop.close()
-                self._send_json({
-                    "success": True,
-                    "report": result
-                })
-            
-            elif path == "/search":
-                # Parse search parameters
-                args = {"limit": int(params.get('limit', 10))}
-                if params.get('themes'):
-                    args['themes'] = params['themes'].split(',')
-                if params.get('tags'):
-                    args['tags'] = params['tags'].split(',')
-                if params.get('price_band'):
-                    args['price_band'] = params['price_band']
-                if params.get('region'):
-                    args['region'] = params['region']
-                
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(
-                    self.mcp_server.poi_manager.search_pois(**args)
-                )
-                loop.close()
-                self._send_json({
-                    "success": True,
-                    "data": result,
-                    "query": args
-                })
-            
-            elif path == "/poi":
-                poi_id = params.get('poi_id')
-                if not poi_id:
-                    self._send_error("Missing poi_id parameter", 400)
-                    return
-                
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(
-                    self.mcp_server.poi_manager.get_poi_details(poi_id=poi_id)
-                )
-                loop.close()
-                self._send_json({
-                    "success": True,
-                    "poi_id": poi_id,
-                    "data": result
-                })
-            
-            elif path == "/insights":
-                args = {}
-                if params.get('region'):
-                    args['region'] = params['region']
-                if params.get('season'):
-                    args['season'] = params['season']
-                if params.get('budget_range'):
-                    args['budget_range'] = params['budget_range']
-                if params.get('interests'):
-                    args['interests'] = params['interests'].split(',')
-                
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(
-                    self.mcp_server.travel_insights.get_insights(**args)
-                )
-                loop.close()
-                self._send_json({
-                    "success": True,
-                    "insights": result
-                })
-            
-            else:
-                self._send_error("Endpoint not found", 404)
+        parsed_path = urlparse(self.path)
+        if not parsed_path.query:
+            body = _STATIC_GET.get(parsed_path.path)
+            if body is not None:
+                self._set_headers()
+                self.wfile.write(body)
+                return
         
-        except Exception as e:
-            self._send_error(str(e))
+        handler = _ROUTES_GET.get(parsed_path.path)
+        if handler is None:
+            self._send_error("Endpoint not found", 404)
+            return
+        
+        # Single-valued query params; reversed so a repeated key keeps its first value
+        params = dict(reversed(parse_qsl(parsed_path.query)))
+        # Compact JSON unless ?pretty=1 is given
+        self._dispatch(handler, params, pretty=params.get('pretty') == '1')
     
     def do_POST(self):
         try:
             content_length = int(self.headers.get('Content-Length', 0))
             post_data = self.rfile.read(content_length)
-            
-            try:
-                data = json.loads(post_data.decode('utf-8')) if post_data else {}
-            except json.JSONDecodeError:
-                data = {}
-            
-            parsed_path = urlparse(self.path)
-            path = parsed_path.path
-            
-            if path == "/analyze":
-                itinerary = data.get('itinerary')
-                if not itinerary:
-                    self._send_error("Missing 'itinerary' in request body", 400)
-                    return
-                
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(
-                    self.mcp_server.itinerary_analyzer.analyze(itinerary=itinerary)
-                )
-                loop.close()
-                self._send_json({
-                    "success": True,
-                    "analysis": result
-                })
-            
-            else:
-                self._send_error("POST endpoint not found", 404)
-        
         except Exception as e:
             self._send_error(str(e))
+            return
+        
+        try:
+            data = json.loads(post_data.decode('utf-8')) if post_data else {}
+        except json.JSONDecodeError:
+            data = {}
+        
+        handler = _ROUTES_POST.get(urlparse(self.path).path)
+        if handler is None:
+            self._send_error("POST endpoint not found", 404)
+            return
+        
+        self._dispatch(handler, data)
     
     def log_message(self, format, *args):
         # Suppress default logging
@@ -196,18 +248,9 @@ class ExvoraWebhookHandler(BaseHTTPRequestHandler):
 
 def run_webhook_server(port=8080):
     server_address = ('', port)
-    
-    # Create a custom handler class that shares the MCP server instance
-    class SharedMCPHandler(ExvoraWebhookHandler):
-        _mcp_server = None
-        
-        def __init__(self, *args, **kwargs):
-            if SharedMCPHandler._mcp_server is None:
-                SharedMCPHandler._mcp_server = ExvoraTravelMCPServer()
-            self.mcp_server = SharedMCPHandler._mcp_server
-            BaseHTTPRequestHandler.__init__(self, *args, **kwargs)
-    
-    httpd = HTTPServer(server_address, SharedMCPHandler)
+    # One thread per connection; they all hand their MCP work to the shared loop
+    httpd = ThreadingHTTPServer(server_address, ExvoraWebhookHandler)
+    httpd.daemon_threads = True
     print(f"🌐 Exvora Travel Webhook Server running on http://localhost:{port}")
     print(f"🔍 Test: http://localhost:{port}/search?themes=Cultural")
     print(f"✅ Validate: http://localhost:{port}/validate?fix_issues=true")
@@ -1,48 +1,130 @@
 #!/usr/bin/env python3
 """Benchmark script for Exvora AI API latency."""
 
+import argparse
+import asyncio
 import time
 import statistics
 import os
 import sys
+from pathlib import Path
 from typing import List, Dict, Any
 
 # Add app directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import httpx
 import requests
 
-def benchmark_endpoint(url: str, request_data: Dict[str, Any], iterations: int = 10) -> Dict[str, Any]:
-    """Benchmark an endpoint and return latency statistics."""
+def _latency_stats(latencies: List[float]) -> Dict[str, Any]:
+    """Summarize request latencies (milliseconds)."""
+    if not latencies:
+        return {"error": "All requests failed"}
+    
+    return {
+        "count": len(latencies),
+        "p50": statistics.median(latencies),
+        "p95": statistics.quantiles(latencies, n=20)[18],  # 95th percentile
+        "mean": statistics.mean(latencies),
+        "min": min(latencies),
+        "max": max(latencies)
+    }
+
+async def _benchmark_concurrent(url: str, request_data: Dict[str, Any],
+                                iterations: int, concurrency: int, warmup: int) -> List[float]:
+    """Issue requests with up to `concurrency` in flight over one pooled client."""
+    sem = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    
+    async with httpx.AsyncClient(timeout=30, limits=limits) as client:
+        # Unmeasured warm-up requests
+        for _ in range(warmup):
+            try:
+                await client.post(url, json=request_data)
+            except Exception:
+                pass
+        
+        async def one(i: int):
+            async with sem:
+                start_ns = time.perf_counter_ns()
+                try:
+                    response = await client.post(url, json=request_data)
+                    response.raise_for_status()
+                except Exception as e:
+                    print(f"  Request {i+1}: Failed - {e}")
+                    return None
+                latency = (time.perf_counter_ns() - start_ns) / 1e6  # Convert to milliseconds
+                print(f"  Request {i+1}: {latency:.1f}ms")
+                return latency
+        
+        results = await asyncio.gather(*(one(i) for i in range(iterations)))
+    
+    return [latency for latency in results if latency is not None]
+
+def benchmark_endpoint(url: str, request_data: Dict[str, Any], iterations: int = 10,
+                       concurrency: int = 1, warmup: int = 2) -> Dict[str, Any]:
+    """Benchmark an endpoint and return latency statistics.
+
+    The first `warmup` requests are sent but left out of the statistics.
+    """
+    if concurrency > 1:
+        print(f"Benchmarking {url} with {iterations} iterations, {concurrency} concurrent...")
+        return _latency_stats(asyncio.run(
+            _benchmark_concurrent(url, request_data, iterations, concurrency, warmup)
+        ))
+    
     latencies = []
     
     print(f"Benchmarking {url} with {iterations} iterations...")
     
+    # One keep-alive connection for every request
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    
+    # Warm-up requests so DNS, connection setup and server-side caches
+    # stay out of the samples
+    for _ in range(warmup):
+        try:
+            session.post(url, json=request_data, timeout=30)
+        except Exception:
+            pass
+    
     for i in range(iterations):
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         try:
-            response = requests.post(url, json=request_data, timeout=30)
+            response = session.post(url, json=request_data, timeout=30)
             response.raise_for_status()
-            latency = (time.time() - start_time) * 1000  # Convert to milliseconds
+            latency = (time.perf_counter_ns() - start_ns) / 1e6  # Convert to milliseconds
             latencies.append(latency)
             print(f"  Request {i+1}: {latency:.1f}ms")
         except Exception as e:
             print(f"  Request {i+1}: Failed - {e}")
     
-    if not latencies:
-        return {"error": "All requests failed"}
-    
-    return {
-        "count": len(latencies),
-        "p50": statistics.median(latencies),
-        "p95": statistics.quantiles(latencies, n=20)[18],  # 95th percentile
-        "mean": statistics.mean(latencies),
-        "min": min(latencies),
-        "max": max(latencies)
-    }
+    session.close()
+    return _latency_stats(latencies)
+
+def _report_lines(results: Dict[str, Any]) -> List[str]:
+    """Markdown bullet lines for one benchmark's results."""
+    if "error" in results:
+        return [f"- Error: {results['error']}\n"]
+    return [
+        f"- P50: {results['p50']:.1f}ms\n",
+        f"- P95: {results['p95']:.1f}ms\n",
+        f"- Mean: {results['mean']:.1f}ms\n",
+        f"- Range: {results['min']:.1f}ms - {results['max']:.1f}ms\n",
+    ]
 
 def main():
     """Run latency benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=10, help="requests per benchmark")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="requests in flight at once (1 = sequential)")
+    parser.add_argument("--warmup", type=int, default=2,
+                        help="unmeasured requests sent before sampling")
+    args = parser.parse_args()
+    
     base_url = os.getenv("EXVORA_API_URL", "http://localhost:8000")
     
     # Sample request data
@@ -78,7 +160,8 @@ def main():
     
     # Test with heuristic transfers (default)
     print("1. Heuristic Transfers (USE_GOOGLE_ROUTES=false)")
-    heuristic_results = benchmark_endpoint(f"{base_url}/v1/itinerary", request_data)
+    heuristic_results = benchmark_endpoint(f"{base_url}/v1/itinerary", request_data,
+                                           args.iterations, args.concurrency, args.warmup)
     
     if "error" not in heuristic_results:
         print(f"   P50: {heuristic_results['p50']:.1f}ms")
@@ -93,7 +176,8 @@ def main():
     # Test with Google Routes if enabled
     if os.getenv("USE_GOOGLE_ROUTES") == "true" and os.getenv("GOOGLE_MAPS_API_KEY"):
         print("2. Google Routes (USE_GOOGLE_ROUTES=true)")
-        google_results = benchmark_endpoint(f"{base_url}/v1/itinerary", request_data)
+        google_results = benchmark_endpoint(f"{base_url}/v1/itinerary", request_data,
+                                            args.iterations, args.concurrency, args.warmup)
         
         if "error" not in google_results:
             print(f"   P50: {google_results['p50']:.1f}ms")
@@ -114,32 +198,22 @@ def main():
             print(f"{'P95':<10} {heuristic_results['p95']:<12.1f} {google_results['p95']:<12.1f} {google_results['p95'] - heuristic_results['p95']:<+10.1f}")
             print(f"{'Mean':<10} {heuristic_results['mean']:<12.1f} {google_results['mean']:<12.1f} {google_results['mean'] - heuristic_results['mean']:<+10.1f}")
     
-    # Save results to docs/qa/latency.md
-    os.makedirs("docs/qa", exist_ok=True)
+    # Save results to docs/qa/latency.md, built up and written in one go
+    parts = [
+        "# Exvora AI API Latency Benchmark Results\n\n",
+        f"Generated: {time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())}\n\n",
+        f"Base URL: {base_url}\n\n",
+        "## Heuristic Transfers\n\n",
+    ]
+    parts += _report_lines(heuristic_results)
     
-    with open("docs/qa/latency.md", "w") as f:
-        f.write("# Exvora AI API Latency Benchmark Results\n\n")
-        f.write(f"Generated: {time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())}\n\n")
-        f.write(f"Base URL: {base_url}\n\n")
-        
-        f.write("## Heuristic Transfers\n\n")
-        if "error" not in heuristic_results:
-            f.write(f"- P50: {heuristic_results['p50']:.1f}ms\n")
-            f.write(f"- P95: {heuristic_results['p95']:.1f}ms\n")
-            f.write(f"- Mean: {heuristic_results['mean']:.1f}ms\n")
-            f.write(f"- Range: {heuristic_results['min']:.1f}ms - {heuristic_results['max']:.1f}ms\n")
-        else:
-            f.write(f"- Error: {heuristic_results['error']}\n")
-        
-        if os.getenv("USE_GOOGLE_ROUTES") == "true" and os.getenv("GOOGLE_MAPS_API_KEY"):
-            f.write("\n## Google Routes\n\n")
-            if "error" not in google_results:
-                f.write(f"- P50: {google_results['p50']:.1f}ms\n")
-                f.write(f"- P95: {google_results['p95']:.1f}ms\n")
-                f.write(f"- Mean: {google_results['mean']:.1f}ms\n")
-                f.write(f"- Range: {google_results['min']:.1f}ms - {google_results['max']:.1f}ms\n")
-            else:
-                f.write(f"- Error: {google_results['error']}\n")
+    if os.getenv("USE_GOOGLE_ROUTES") == "true" and os.getenv("GOOGLE_MAPS_API_KEY"):
+        parts.append("\n## Google Routes\n\n")
+        parts += _report_lines(google_results)
+    
+    report_path = Path("docs/qa/latency.md")
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text("".join(parts))
     
     print(f"\nResults saved to docs/qa/latency.md")
 
@@ -1,20 +1,67 @@
 #!/usr/bin/env python3
 """Export OpenAPI schema from Exvora AI app."""
 
+import hashlib
 import json
 import sys
 import os
+import tempfile
+from importlib import metadata
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
 
 # Add app directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, str(ROOT))
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+def _source_key() -> str:
+    """Hash the app sources, schema-affecting library versions and the encoder."""
+    h = hashlib.blake2b(digest_size=8)
+    for package in ("fastapi", "pydantic"):
+        h.update(f"{package}=={metadata.version(package)}\n".encode())
+    # orjson writes non-ASCII as UTF-8 where json escapes it, so the bytes differ
+    h.update((f"orjson=={orjson.__version__}\n" if HAS_ORJSON else "json\n").encode())
+    for path in sorted((ROOT / "app").rglob("*.py")):
+        h.update(path.relative_to(ROOT).as_posix().encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
 
-from app.main import app
+def _encode(schema) -> bytes:
+    if HAS_ORJSON:
+        return orjson.dumps(schema, option=orjson.OPT_INDENT_2)
+    return json.dumps(schema, indent=2).encode("utf-8")
 
 def main():
-    """Export OpenAPI schema to stdout."""
+    """Export OpenAPI schema to stdout.
+
+    The encoded schema is cached in the temp directory under a hash of
+    app/**/*.py and the encoder in use, so repeat runs skip importing the app
+    until a source changes.
+    """
     try:
-        openapi_schema = app.openapi()
-        json.dump(openapi_schema, sys.stdout, indent=2)
+        cache_path = Path(tempfile.gettempdir()) / f"exvora-openapi-{_source_key()}.json"
+        try:
+            body = cache_path.read_bytes()
+        except OSError:
+            from app.main import app
+            body = _encode(app.openapi())
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                tmp_path.write_bytes(body)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                pass  # Caching is best-effort
+
+        # Write bytes straight out, skipping the text layer of stdout
+        sys.stdout.flush()
+        sys.stdout.buffer.write(body)
+        sys.stdout.buffer.flush()
         print(file=sys.stderr)  # Add newline to stderr for clean output
     except Exception as e:
         print(f"Error exporting OpenAPI schema: {e}", file=sys.stderr)
@@ -12,7 +12,6 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import accuracy_score, roc_auc_score
-from sklearn.feature_extraction.text import CountVectorizer
 import joblib
 from datetime import datetime
 
@@ -20,101 +19,121 @@ from datetime import datetime
 os.makedirs("data", exist_ok=True)
 os.makedirs("app/models", exist_ok=True)
 
+# Feature layout shared by data generation, training and the exported weights
+TAG_VOCAB = np.array([
+    "culture", "nature", "food", "history", "art", "music", "sports", "shopping",
+    "adventure", "relaxation", "family", "romantic", "budget", "luxury", "local",
+    "tourist", "quiet", "crowded", "indoor", "outdoor", "religious", "secular",
+    "modern", "traditional", "urban", "rural", "beach", "mountain", "city", "village"
+])
+PRICE_BANDS = np.array(["free", "low", "medium", "high"])
+NUMERIC_FEATURES = np.array(["estimated_cost", "duration_minutes", "opening_align", "distance_km"])
+FEATURE_NAMES = np.concatenate([TAG_VOCAB, np.char.add("price_", PRICE_BANDS), NUMERIC_FEATURES])
+
 def generate_synthetic_data(n_samples=400):
     """Generate synthetic training data for preference scoring."""
-    np.random.seed(42)  # For reproducibility
-    
-    # Define tag vocabulary
-    tag_vocab = [
-        "culture", "nature", "food", "history", "art", "music", "sports", "shopping",
-        "adventure", "relaxation", "family", "romantic", "budget", "luxury", "local",
-        "tourist", "quiet", "crowded", "indoor", "outdoor", "religious", "secular",
-        "modern", "traditional", "urban", "rural", "beach", "mountain", "city", "village"
-    ]
-    
-    # Price bands
-    price_bands = ["free", "low", "medium", "high"]
-    
-    data = []
-    
-    for i in range(n_samples):
-        # Generate random number of tags (1-4)
-        n_tags = np.random.randint(1, 5)
-        tags = np.random.choice(tag_vocab, n_tags, replace=False)
-        
-        # Generate price band with bias toward lower prices
-        price_band = np.random.choice(price_bands, p=[0.2, 0.4, 0.3, 0.1])
-        
-        # Generate cost based on price band
-        if price_band == "free":
-            cost = 0
-        elif price_band == "low":
-            cost = np.random.uniform(1, 15)
-        elif price_band == "medium":
-            cost = np.random.uniform(15, 50)
-        else:  # high
-            cost = np.random.uniform(50, 200)
-        
-        # Generate duration (30-300 minutes)
-        duration = np.random.uniform(30, 300)
-        
-        # Generate opening alignment (0-1)
-        opening_align = np.random.beta(2, 2)  # Biased toward middle values
-        
-        # Generate distance (0-50 km)
-        distance = np.random.exponential(5)
-        
-        # Generate label based on heuristics
-        # Prefer: lower cost, shorter duration, better opening alignment, closer distance
-        # Also prefer certain tag combinations
-        cost_score = max(0, 1 - cost / 100)  # Lower cost is better
-        duration_score = max(0, 1 - duration / 200)  # Shorter duration is better
-        distance_score = max(0, 1 - distance / 20)  # Closer is better
-        
-        # Tag preference (some tags are more "preferred")
-        preferred_tags = {"culture", "nature", "food", "history", "art", "local", "quiet"}
-        tag_score = len(set(tags) & preferred_tags) / len(tags) if len(tags) > 0 else 0
-        
-        # Combined score
-        combined_score = (cost_score * 0.3 + duration_score * 0.2 + 
-                         float(opening_align) * 0.2 + distance_score * 0.1 + tag_score * 0.2)
-        
-        # Add some noise and convert to binary
-        noise = np.random.normal(0, 0.1)
-        label = 1 if combined_score + noise > 0.5 else 0
-        
-        data.append({
-            "label": label,
-            "tags": ";".join(tags),
-            "price_band": price_band,
-            "estimated_cost": round(cost, 2),
-            "duration_minutes": round(duration),
-            "opening_align": round(opening_align, 3),
-            "distance_km": round(distance, 2)
-        })
-    
-    return pd.DataFrame(data)
+    rng = np.random.default_rng(42)  # For reproducibility
+    
+    # Generate random number of tags (1-4), drawn without replacement per row:
+    # the first n_tags columns of a random permutation of the vocabulary
+    n_tags = rng.integers(1, 5, n_samples)
+    tag_choice = rng.random((n_samples, len(TAG_VOCAB))).argsort(axis=1)[:, :4]
+    tag_mask = np.arange(4) < n_tags[:, None]
+    
+    # Generate price band with bias toward lower prices
+    price_band = rng.choice(PRICE_BANDS, n_samples, p=[0.2, 0.4, 0.3, 0.1])
+    
+    # Generate cost based on price band
+    cost = np.select(
+        [price_band == "free", price_band == "low", price_band == "medium"],
+        [0.0, rng.uniform(1, 15, n_samples), rng.uniform(15, 50, n_samples)],
+        rng.uniform(50, 200, n_samples)
+    )
+    
+    # Generate duration (30-300 minutes)
+    duration = rng.uniform(30, 300, n_samples)
+    
+    # Generate opening alignment (0-1)
+    opening_align = rng.beta(2, 2, n_samples)  # Biased toward middle values
+    
+    # Generate distance (0-50 km)
+    distance = rng.exponential(5, n_samples)
+    
+    # Generate label based on heuristics
+    # Prefer: lower cost, shorter duration, better opening alignment, closer distance
+    # Also prefer certain tag combinations
+    cost_score = np.maximum(0, 1 - cost / 100)  # Lower cost is better
+    duration_score = np.maximum(0, 1 - duration / 200)  # Shorter duration is better
+    distance_score = np.maximum(0, 1 - distance / 20)  # Closer is better
+    
+    # Tag preference (some tags are more "preferred")
+    preferred_tags = {"culture", "nature", "food", "history", "art", "local", "quiet"}
+    is_preferred = np.isin(TAG_VOCAB, list(preferred_tags))
+    tag_score = (is_preferred[tag_choice] & tag_mask).sum(axis=1) / n_tags
+    
+    # Combined score
+    combined_score = (cost_score * 0.3 + duration_score * 0.2 + 
+                     opening_align * 0.2 + distance_score * 0.1 + tag_score * 0.2)
+    
+    # Add some noise and convert to binary
+    noise = rng.normal(0, 0.1, n_samples)
+    label = (combined_score + noise > 0.5).astype(int)
+    
+    tags = [";".join(TAG_VOCAB[row[:k]]) for row, k in zip(tag_choice, n_tags)]
+    
+    return pd.DataFrame({
+        "label": label,
+        "tags": tags,
+        "price_band": price_band,
+        "estimated_cost": cost.round(2),
+        "duration_minutes": duration.round().astype(int),
+        "opening_align": opening_align.round(3),
+        "distance_km": distance.round(2)
+    })
 
 def build_features(df, tag_vocab, feature_names):
     """Build feature matrix from dataframe."""
-    # One-hot encode tags
-    tag_vectorizer = CountVectorizer(vocabulary=tag_vocab, binary=True)
-    tag_features = tag_vectorizer.fit_transform(df["tags"]).toarray()
+    # One-hot encode tags: collect (row, column) pairs, then set them in one go
+    tag_idx = {tag: i for i, tag in enumerate(tag_vocab)}
+    rows, cols = [], []
+    for row, tags in enumerate(df["tags"].fillna("").str.lower().str.split(";")):
+        for tag in tags:
+            col = tag_idx.get(tag.strip())
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+    tag_features = np.zeros((len(df), len(tag_vocab)), dtype=np.float32)
+    tag_features[rows, cols] = 1
     
     # One-hot encode price bands
-    price_bands = ["free", "low", "medium", "high"]
-    price_features = np.zeros((len(df), len(price_bands)))
-    for i, price_band in enumerate(price_bands):
-        price_features[:, i] = (df["price_band"] == price_band).astype(int)
+    price_features = (df["price_band"].to_numpy()[:, None] == PRICE_BANDS).astype(np.float32)
     
     # Numeric features
-    numeric_features = df[["estimated_cost", "duration_minutes", "opening_align", "distance_km"]].values
+    numeric_features = df[NUMERIC_FEATURES].to_numpy(dtype=np.float32)
     
     # Combine all features
     features = np.hstack([tag_features, price_features, numeric_features])
     
     return features
 
+def export_linear_model(model, path):
+    """Export the fitted scaler + logistic regression as flat float32 arrays.
+
+    Scoring then only needs sigmoid(((x - mean) / scale) @ w + b), without
+    going through sklearn's Pipeline. FEATURE_NAMES is stored alongside so the
+    column order travels with the weights.
+    """
+    scaler = model.named_steps["scaler"]
+    clf = model.named_steps["classifier"]
+    np.savez_compressed(
+        path,
+        mean=scaler.mean_.astype(np.float32),
+        scale=scaler.scale_.astype(np.float32),
+        w=clf.coef_[0].astype(np.float32),
+        b=np.float32(clf.intercept_[0]),
+        feature_names=FEATURE_NAMES
+    )
+
 def train_model():
     """Train the preference scoring model."""
     print("Training preference scoring model...")
@@ -133,23 +152,10 @@ def train_model():
     print(f"Training data shape: {df.shape}")
     print(f"Label distribution: {df['label'].value_counts().to_dict()}")
     
-    # Define tag vocabulary
-    tag_vocab = [
-        "culture", "nature", "food", "history", "art", "music", "sports", "shopping",
-        "adventure", "relaxation", "family", "romantic", "budget", "luxury", "local",
-        "tourist", "quiet", "crowded", "indoor", "outdoor", "religious", "secular",
-        "modern", "traditional", "urban", "rural", "beach", "mountain", "city", "village"
-    ]
-    
     # Build features
-    X = build_features(df, tag_vocab, None)
+    X = build_features(df, TAG_VOCAB, FEATURE_NAMES)
     y = df["label"].values
     
-    # Define feature names
-    price_bands = ["free", "low", "medium", "high"]
-    numeric_features = ["estimated_cost", "duration_minutes", "opening_align", "distance_km"]
-    feature_names = tag_vocab + [f"price_{band}" for band in price_bands] + numeric_features
-    
     # Train model
     model = Pipeline([
         ("scaler", StandardScaler()),
@@ -173,17 +179,21 @@ def train_model():
     joblib.dump(model, model_path)
     print(f"Model saved to {model_path}")
     
+    weights_path = "app/models/pref_lr_v1.npz"
+    export_linear_model(model, weights_path)
+    print(f"Model weights saved to {weights_path}")
+    
     # Save metadata
     metadata = {
         "version": "pref_lr_v1",
         "created_at": datetime.now().isoformat(),
-        "feature_names": feature_names,
-        "tag_vocab": tag_vocab,
+        "feature_names": FEATURE_NAMES.tolist(),
+        "tag_vocab": TAG_VOCAB.tolist(),
         "metrics": {
             "accuracy": accuracy,
             "auc": auc,
             "n_samples": len(df),
-            "n_features": len(feature_names)
+            "n_features": len(FEATURE_NAMES)
         },
         "model_type": "LogisticRegression",
         "preprocessing": ["StandardScaler"]
@@ -0,0 +1,18 @@
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    One TestClient shared by the whole test session.
+
+    Not entered as a context manager: the app's startup hook loads the
+    sentence-transformer reranker model, which these tests don't exercise.
+    """
+    from app.main import app
+    return TestClient(app)
@@ -2,6 +2,7 @@
 Tests for tag affinity computation.
 """
 
+import math
 import pytest
 from datetime import datetime, timedelta
 from app.engine.affinity import (
@@ -230,3 +231,23 @@ def test_compute_affinity_invalid_timestamp():
     affinities = compute_affinity_by_tag(feedback_events, now)
     assert "hiking" in affinities
     assert affinities["hiking"] > 0
+
+
+def test_compute_affinity_matches_sequential_ema():
+    """Test that affinities equal replaying decay + EMA event by event."""
+    now = datetime(2025, 9, 1, 12, 0)
+    
+    feedback_events = [
+        {"poi_id": "a", "rating": 5, "tags": ["hiking"], "ts": (now - timedelta(days=3)).isoformat()},
+        {"poi_id": "b", "rating": 1, "tags": ["hiking", "crowded"], "ts": (now - timedelta(days=1)).isoformat()},
+    ]
+    
+    affinities = compute_affinity_by_tag(feedback_events, now)
+    
+    # hiking: +1 three days ago, decayed two days, EMA with -1, decayed one more day
+    hiking = 0.25 * 1.0 * math.exp(-0.02 * 2)
+    hiking = (0.25 * -1.0 + 0.75 * hiking) * math.exp(-0.02 * 1)
+    crowded = 0.25 * -1.0 * math.exp(-0.02 * 1)
+    
+    assert affinities["hiking"] == pytest.approx(hiking)
+    assert affinities["crowded"] == pytest.approx(crowded)
@@ -6,10 +6,18 @@ Tests the fundamental contract of the itinerary API to ensure all new features
 without breaking the core API structure.
 """
 
-from fastapi.testclient import TestClient
-from app.main import app
-
-client = TestClient(app)
+import asyncio
+import json
+import os
+import statistics
+import time
+import httpx
+import orjson
+import pytest
+
+# Latency bound for test_api_response_time (seconds); generous by default so
+# loaded shared runners under pytest -n auto don't flake
+MAX_RESPONSE_TIME_S = float(os.environ.get("EXVORA_TEST_MAX_RESPONSE_TIME_S", "5.0"))
 
 REQ = {
     "trip_context": {
@@ -35,17 +43,32 @@ REQ = {
     }
 }
 
+# REQ is sent by most tests; encode it once rather than on every post
+REQ_BYTES = json.dumps(REQ).encode("utf-8")
+JSON_HEADERS = {"content-type": "application/json"}
+
+
+@pytest.fixture(scope="module")
+def itinerary_response(client):
+    """One /v1/itinerary response for REQ, shared by the read-only contract tests."""
+    return client.post("/v1/itinerary", content=REQ_BYTES, headers=JSON_HEADERS)
+
+
+@pytest.fixture(scope="module")
+def itinerary_data(itinerary_response):
+    """The shared response body, decoded once."""
+    return orjson.loads(itinerary_response.content)
+
 
 def _is_transfer(x):
     """Helper to identify transfer items."""
     return x.get("type") == "transfer"
 
 
-def test_itinerary_smoke_contract():
+def test_itinerary_smoke_contract(itinerary_response, itinerary_data):
     """Test that the core itinerary API contract is preserved with all new features."""
-    response = client.post("/v1/itinerary", json=REQ)
-    assert response.status_code == 200
-    data = response.json()
+    assert itinerary_response.status_code == 200
+    data = itinerary_data
 
     # Top-level structure
     assert "days" in data and isinstance(data["days"], list) and len(data["days"]) >= 1
@@ -77,7 +100,7 @@ def test_itinerary_smoke_contract():
         assert daily_cost["date"] == data["days"][i]["date"], "Daily cost dates should match day dates"
 
 
-def test_feedback_preserves_contract():
+def test_feedback_preserves_contract(client):
     """Test that the feedback API contract is preserved with all new features."""
     # For smoke testing, we'll just verify the feedback endpoint exists and handles requests
     # The complex Pydantic model validation is tested in dedicated feedback tests
@@ -108,11 +131,10 @@ def test_feedback_preserves_contract():
         assert "summary" in data and "est_cost" in data["summary"]
 
 
-def test_budget_optimizer_integration():
+def test_budget_optimizer_integration(itinerary_response, itinerary_data):
     """Test that budget optimizer is properly integrated and working."""
-    response = client.post("/v1/itinerary", json=REQ)
-    assert response.status_code == 200
-    data = response.json()
+    assert itinerary_response.status_code == 200
+    data = itinerary_data
 
     # Check budget totals structure
     totals = data["totals"]
@@ -130,11 +152,10 @@ def test_budget_optimizer_integration():
     assert totals["trip_cost_est"] <= daily_cap * len(data["days"]) * 1.1, "Trip total should not exceed daily cap * days"
 
 
-def test_ml_preference_scorer_integration():
+def test_ml_preference_scorer_integration(itinerary_response, itinerary_data):
     """Test that ML preference scorer is integrated and working."""
-    response = client.post("/v1/itinerary", json=REQ)
-    assert response.status_code == 200
-    data = response.json()
+    assert itinerary_response.status_code == 200
+    data = itinerary_data
 
     # Check that ranking metadata includes preference model version
     # This would be in the logs, but we can verify the response structure is intact
@@ -157,11 +178,10 @@ def test_ml_preference_scorer_integration():
     # The actual preference application is tested in the reranker tests
 
 
-def test_reranker_integration():
+def test_reranker_integration(itinerary_response, itinerary_data):
     """Test that contextual reranker is integrated and working."""
-    response = client.post("/v1/itinerary", json=REQ)
-    assert response.status_code == 200
-    data = response.json()
+    assert itinerary_response.status_code == 200
+    data = itinerary_data
 
     # Verify that audit_log is being processed (no errors)
     assert "days" in data
@@ -177,22 +197,26 @@ def test_reranker_integration():
                 assert "estimated_cost" in item
 
 
-def test_api_response_time():
+@pytest.mark.slow
+def test_api_response_time(client):
     """Test that API responds within reasonable time with all features enabled."""
-    import time
+    samples = []
+    for _ in range(3):
+        start_time = time.perf_counter()
+        response = client.post("/v1/itinerary", content=REQ_BYTES, headers=JSON_HEADERS)
+        samples.append(time.perf_counter() - start_time)
+        assert response.status_code == 200
     
-    start_time = time.time()
-    response = client.post("/v1/itinerary", json=REQ)
-    end_time = time.time()
+    # Median of three monotonic samples, so one cold or preempted run can't fail the test
+    response_time = statistics.median(samples)
     
-    assert response.status_code == 200
-    response_time = end_time - start_time
-    
-    # Should respond within 5 seconds (reasonable for ML + budget optimization)
-    assert response_time < 5.0, f"API took too long: {response_time:.2f}s"
+    assert response_time < MAX_RESPONSE_TIME_S, (
+        f"API took too long: p50={response_time:.2f}s max={max(samples):.2f}s "
+        f"(limit {MAX_RESPONSE_TIME_S}s)"
+    )
 
 
-def test_error_handling():
+def test_error_handling(client):
     """Test that API handles errors gracefully."""
     # Test with invalid request
     invalid_req = {
@@ -218,17 +242,20 @@ def test_error_handling():
         assert "totals" in data
 
 
-def test_deterministic_behavior():
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_deterministic_behavior(client):
     """Test that API returns deterministic results for the same input."""
-    # Make two identical requests
-    response1 = client.post("/v1/itinerary", json=REQ)
-    response2 = client.post("/v1/itinerary", json=REQ)
+    # Make two identical requests, in flight together over one in-process client
+    transport = httpx.ASGITransport(app=client.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        response1, response2 = await asyncio.gather(
+            ac.post("/v1/itinerary", content=REQ_BYTES, headers=JSON_HEADERS),
+            ac.post("/v1/itinerary", content=REQ_BYTES, headers=JSON_HEADERS),
+        )
     
     assert response1.status_code == 200
     assert response2.status_code == 200
     
-    data1 = response1.json()
-    data2 = response2.json()
-    
-    # Results should be identical (deterministic)
-    assert data1 == data2, "API should return deterministic results for identical inputs"
+    # Results should be identical (deterministic), down to the encoded bytes
+    assert response1.content == response2.content, "API should return deterministic results for identical inputs"
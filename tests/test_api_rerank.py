@@ -3,59 +3,96 @@ API tests for rerank endpoint.
 """
 
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
 
-client = TestClient(app)
 
+def _is_desc(xs):
+    """True if xs is in non-increasing order."""
+    return all(a >= b for a, b in zip(xs, xs[1:]))
 
-def test_rerank_endpoint_success():
-    """Test successful rerank endpoint call."""
-    request_data = {
-        "candidates": [
+
+SUCCESS_REQUEST = {
+    "candidates": [
+        {
+            "poi_id": "ella_hike",
+            "tags": ["hiking", "quiet"],
+            "score": 0.62
+        },
+        {
+            "poi_id": "nightlife_district",
+            "tags": ["nightlife"],
+            "score": 0.58
+        },
+        {
+            "poi_id": "pettah_market",
+            "tags": ["street_food"],
+            "score": 0.55
+        }
+    ],
+    "preferences": {
+        "themes": ["nature"],
+        "avoid_tags": ["crowded"]
+    },
+    "audit_log": {
+        "feedback_events": [
             {
                 "poi_id": "ella_hike",
+                "rating": 5,
                 "tags": ["hiking", "quiet"],
-                "score": 0.62
+                "ts": "2025-08-25T08:30:00Z"
             },
             {
                 "poi_id": "nightlife_district",
-                "tags": ["nightlife"],
-                "score": 0.58
-            },
-            {
-                "poi_id": "pettah_market",
-                "tags": ["street_food"],
-                "score": 0.55
+                "rating": 1,
+                "tags": ["nightlife", "crowded"],
+                "ts": "2025-08-24T19:10:00Z"
             }
-        ],
-        "preferences": {
-            "themes": ["nature"],
-            "avoid_tags": ["crowded"]
-        },
-        "audit_log": {
-            "feedback_events": [
-                {
-                    "poi_id": "ella_hike",
-                    "rating": 5,
-                    "tags": ["hiking", "quiet"],
-                    "ts": "2025-08-25T08:30:00Z"
-                },
-                {
-                    "poi_id": "nightlife_district",
-                    "rating": 1,
-                    "tags": ["nightlife", "crowded"],
-                    "ts": "2025-08-24T19:10:00Z"
-                }
-            ]
+        ]
+    }
+}
+
+ORDERING_REQUEST = {
+    "candidates": SUCCESS_REQUEST["candidates"][:2],
+    "preferences": {},
+    "audit_log": SUCCESS_REQUEST["audit_log"]
+}
+
+REASONS_REQUEST = {
+    "candidates": [
+        {
+            "poi_id": "hiking_trail",
+            "tags": ["hiking", "nature"],
+            "score": 0.6
         }
+    ],
+    "preferences": {},
+    "audit_log": {
+        "feedback_events": [
+            {
+                "poi_id": "hiking_trail",
+                "rating": 5,
+                "tags": ["hiking", "nature"],
+                "ts": "2025-08-25T08:30:00Z"
+            }
+        ]
     }
-    
+}
+
+
+@pytest.mark.parametrize(
+    "request_data,expected_order,score_shift",
+    [
+        (SUCCESS_REQUEST, None, {}),
+        # Ella hike boosted by its positive rating, nightlife penalized by its negative one
+        (ORDERING_REQUEST, ["ella_hike", "nightlife_district"], {"ella_hike": +1, "nightlife_district": -1}),
+        (REASONS_REQUEST, None, {}),
+    ],
+    ids=["success", "expected_ordering", "with_reasons"],
+)
+def test_rerank_endpoint_feedback_scoring(client, request_data, expected_order, score_shift):
+    """Test feedback-driven reranking: ordering, score shifts and reasons."""
     response = client.post("/v1/rerank", json=request_data)
     
-    # Should return 200
     assert response.status_code == 200
-    
     data = response.json()
     
     # Should have reranked candidates
@@ -63,7 +100,7 @@ def test_rerank_endpoint_success():
     assert "metadata" in data
     
     reranked = data["reranked"]
-    assert len(reranked) == 3
+    assert len(reranked) == len(request_data["candidates"])
     
     # Should have poi_id and score for each
     for candidate in reranked:
@@ -73,102 +110,29 @@ def test_rerank_endpoint_success():
     
     # Should be sorted by score (descending)
     scores = [c["score"] for c in reranked]
-    assert scores == sorted(scores, reverse=True)
-    
-    # Metadata should indicate reranking was applied
-    metadata = data["metadata"]
-    assert metadata["rerank_applied"] is True
-    assert metadata["n_feedback_events"] == 2
-
-
-def test_rerank_endpoint_expected_ordering():
-    """Test that rerank endpoint produces expected ordering."""
-    request_data = {
-        "candidates": [
-            {
-                "poi_id": "ella_hike",
-                "tags": ["hiking", "quiet"],
-                "score": 0.62
-            },
-            {
-                "poi_id": "nightlife_district",
-                "tags": ["nightlife"],
-                "score": 0.58
-            }
-        ],
-        "preferences": {},
-        "audit_log": {
-            "feedback_events": [
-                {
-                    "poi_id": "ella_hike",
-                    "rating": 5,
-                    "tags": ["hiking", "quiet"],
-                    "ts": "2025-08-25T08:30:00Z"
-                },
-                {
-                    "poi_id": "nightlife_district",
-                    "rating": 1,
-                    "tags": ["nightlife", "crowded"],
-                    "ts": "2025-08-24T19:10:00Z"
-                }
-            ]
-        }
-    }
-    
-    response = client.post("/v1/rerank", json=request_data)
-    
-    assert response.status_code == 200
-    data = response.json()
-    
-    reranked = data["reranked"]
-    
-    # Ella hike should be first (boosted by positive rating)
-    assert reranked[0]["poi_id"] == "ella_hike"
-    assert reranked[0]["score"] > 0.62  # Should be boosted
-    
-    # Nightlife should be second (penalized by negative rating)
-    assert reranked[1]["poi_id"] == "nightlife_district"
-    assert reranked[1]["score"] < 0.58  # Should be penalized
-
-
-def test_rerank_endpoint_with_reasons():
-    """Test that rerank endpoint includes reasons when appropriate."""
-    request_data = {
-        "candidates": [
-            {
-                "poi_id": "hiking_trail",
-                "tags": ["hiking", "nature"],
-                "score": 0.6
-            }
-        ],
-        "preferences": {},
-        "audit_log": {
-            "feedback_events": [
-                {
-                    "poi_id": "hiking_trail",
-                    "rating": 5,
-                    "tags": ["hiking", "nature"],
-                    "ts": "2025-08-25T08:30:00Z"
-                }
-            ]
-        }
-    }
+    assert _is_desc(scores)
     
-    response = client.post("/v1/rerank", json=request_data)
+    if expected_order is not None:
+        assert [c["poi_id"] for c in reranked] == expected_order
     
-    assert response.status_code == 200
-    data = response.json()
+    original_scores = {c["poi_id"]: c["score"] for c in request_data["candidates"]}
+    new_scores = {c["poi_id"]: c["score"] for c in reranked}
+    for poi_id, sign in score_shift.items():
+        assert (new_scores[poi_id] - original_scores[poi_id]) * sign > 0
     
-    reranked = data["reranked"]
-    assert len(reranked) == 1
+    # Reasons are optional (threshold-dependent) but must cite the candidate's tags
+    tags_by_poi = {c["poi_id"]: c["tags"] for c in request_data["candidates"]}
+    for candidate in reranked:
+        if candidate.get("reason") is not None:
+            assert any(tag in candidate["reason"] for tag in tags_by_poi[candidate["poi_id"]])
     
-    # May or may not have reason depending on threshold
-    candidate = reranked[0]
-    if "reason" in candidate and candidate["reason"] is not None:
-        assert "hiking" in candidate["reason"] or "nature" in candidate["reason"]
+    # Metadata should indicate reranking was applied
+    metadata = data["metadata"]
+    assert metadata["rerank_applied"] is True
+    assert metadata["n_feedback_events"] == len(request_data["audit_log"]["feedback_events"])
 
 
-def test_rerank_endpoint_no_audit_log():
+def test_rerank_endpoint_no_audit_log(client):
     """Test rerank endpoint with no audit log."""
     request_data = {
         "candidates": [
@@ -200,7 +164,7 @@ def test_rerank_endpoint_no_audit_log():
     assert metadata["rerank_applied"] is False
 
 
-def test_rerank_endpoint_invalid_rating():
+def test_rerank_endpoint_invalid_rating(client):
     """Test rerank endpoint with invalid rating."""
     request_data = {
         "candidates": [
@@ -229,7 +193,7 @@ def test_rerank_endpoint_invalid_rating():
     assert response.status_code == 422
 
 
-def test_rerank_endpoint_missing_required_fields():
+def test_rerank_endpoint_missing_required_fields(client):
     """Test rerank endpoint with missing required fields."""
     request_data = {
         "candidates": [
@@ -251,7 +215,37 @@ def test_rerank_endpoint_missing_required_fields():
     assert response.status_code == 200
 
 
-def test_rerank_health_endpoint():
+def test_rerank_endpoint_repeat_request_cached(client):
+    """Test that an identical rerank request is answered from the response cache."""
+    from app.api.rerank import _rerank_cache
+    _rerank_cache.clear()
+    
+    request_data = {
+        "candidates": [
+            {"poi_id": "trail", "tags": ["hiking"], "score": 0.5},
+            {"poi_id": "club", "tags": ["nightlife"], "score": 0.5}
+        ],
+        "audit_log": {
+            "feedback_events": [
+                {"poi_id": "x", "rating": 5, "tags": ["hiking"], "ts": "2025-08-25T08:30:00Z"}
+            ]
+        }
+    }
+    
+    response1 = client.post("/v1/rerank", json=request_data)
+    response2 = client.post("/v1/rerank", json=request_data)
+    
+    assert response1.status_code == 200
+    assert response1.json() == response2.json()
+    assert len(_rerank_cache) == 1
+    
+    # A different request is scored separately
+    request_data["candidates"][0]["score"] = 0.6
+    assert client.post("/v1/rerank", json=request_data).status_code == 200
+    assert len(_rerank_cache) == 2
+
+
+def test_rerank_health_endpoint(client):
     """Test rerank health endpoint."""
     response = client.get("/v1/rerank/health")
     
@@ -114,6 +114,17 @@ def test_trip_totals_present_and_stable():
     assert out["totals"]["trip_cost_est"] == 25.0
     assert out["totals"]["trip_transfer_minutes"] == 10
 
+def test_trip_totals_long_day():
+    """Test that totals for long days (numpy reduction path) match the short-day sums."""
+    items = []
+    for i in range(40):
+        items += [act_item(f"Stop {i}", i % 7 + 0.5, ["culture"]), xfer(i % 5)]
+    opt = BudgetOptimizer()
+    totals = opt._compute_trip_totals([make_day("2025-09-13", items), make_day("2025-09-14", items[:10])])
+    assert totals["trip_cost_est"] == round(sum(i % 7 + 0.5 for i in range(40)) + sum(i % 7 + 0.5 for i in range(5)), 2)
+    assert totals["trip_transfer_minutes"] == sum(i % 5 for i in range(40)) + sum(i % 5 for i in range(5))
+    assert [d["est_cost"] for d in totals["daily"]] == [135.0, 12.5]
+
 def test_no_cap_skips_optimization():
     """Test that when no daily_budget_cap is provided, optimization is skipped but totals are still computed."""
     day = make_day("2025-09-14", [
@@ -132,6 +143,15 @@ def test_no_cap_skips_optimization():
     # But should still compute totals
     assert out["totals"]["trip_cost_est"] == 200.0
 
+def test_no_cap_ignores_candidates():
+    """Test that the no-cap path totals the days without reading the other inputs."""
+    day = make_day("2025-09-14", [act_item("Temple", 30, ["culture"]), xfer(12)])
+    out = BudgetOptimizer().optimize_trip(
+        days=[day], trip_context=None, preferences=None, constraints={"daily_budget_cap": None}, candidates_by_date=None
+    )
+    assert out["totals"]["trip_cost_est"] == 30.0
+    assert out["totals"]["trip_transfer_minutes"] == 12
+
 def test_deterministic_ordering():
     """Test that the optimizer produces deterministic results with the same input."""
     day = make_day("2025-09-15", [
@@ -189,6 +209,30 @@ def test_similarity_filtering():
     assert "Art Gallery" in activity_titles
     assert "Gym" not in activity_titles
 
+def test_swap_keeps_cheapest_candidate_when_cap_unreachable():
+    """Test that a slot is swapped once, to the cheapest viable candidate, even if still over cap."""
+    day = make_day("2025-09-17", [
+        act_item("Fancy Dinner", 90, ["food"]),
+    ])
+    candidates = {
+        "2025-09-17": [
+            {"place_id":"bistro","title":"Bistro","estimated_cost":60,"tags":["food"],"price_band":"medium","duration_minutes":60},
+            {"place_id":"diner","title":"Diner","estimated_cost":40,"tags":["food"],"price_band":"low","duration_minutes":60},
+        ]
+    }
+    opt = BudgetOptimizer()
+    out = opt.optimize_trip(
+        days=[day],
+        trip_context={"day_template":{"pace":"moderate"}},
+        preferences={},
+        constraints={"daily_budget_cap":20},
+        candidates_by_date=candidates
+    )
+    new_day = out["days"][0]
+    assert [it.get("title") for it in new_day["items"]] == ["Diner"]
+    assert new_day["summary"]["est_cost"] == 40
+    assert sum("swapped" in n for n in new_day["notes"]) == 1
+
 def test_legacy_function_compatibility():
     """Test that the legacy optimize_day_budget function still works."""
     from app.engine.budget import optimize_day_budget
@@ -200,4 +244,45 @@ def test_legacy_function_compatibility():
     
     assert optimized_day["summary"]["est_cost"] <= 50
     assert len(notes) > 0
-    assert any("swapped" in note for note in notes)
\ No newline at end of file
+    assert any("swapped" in note for note in notes)
+
+def test_swap_skips_places_already_on_day():
+    """Test that a swap never brings in a place that is already on the day."""
+    day = make_day("2025-09-22", [act_item("Museum", 80, ["culture"]), xfer(10), act_item("Cafe", 10, ["culture"])])
+    candidates = {"2025-09-22": [
+        {"place_id":"cafe","title":"Cafe","estimated_cost":10,"tags":["culture"],"price_band":"low","duration_minutes":60},
+        {"place_id":"gallery","title":"Gallery","estimated_cost":20,"tags":["culture"],"price_band":"low","duration_minutes":60},
+    ]}
+    opt = BudgetOptimizer()
+    out = opt.optimize_trip(
+        days=[day],
+        trip_context={"day_template":{"pace":"moderate"}},
+        preferences={},
+        constraints={"daily_budget_cap":40},
+        candidates_by_date=candidates
+    )
+    titles = [it.get("title") for it in out["days"][0]["items"] if it.get("type") != "transfer"]
+    assert titles == ["Gallery", "Cafe"]
+
+def test_viable_swaps_jit_matches_numpy():
+    """Test that the numba swap pre-filter selects exactly what the numpy one does."""
+    pytest.importorskip("numba")
+    import numpy as np
+    from app.engine.budget import _viable_swaps_jit, _viable_swaps_np
+
+    rng = np.random.default_rng(0)
+    empty = np.empty(0, dtype=np.float64)
+    cases = [(empty, empty, np.empty(0, dtype=np.bool_), 50.0, 60.0)]
+    for n in (1, 7, 64, 500):
+        costs = rng.choice([0.0, 10.0, 25.0, 49.999, 50.0, 80.0], size=n)
+        # 0 = no duration; 42/78 are exactly 0.7x/1.3x of 60
+        durs = rng.choice([0.0, 30.0, 42.0, 45.0, 60.0, 78.0, 90.0, 240.0], size=n)
+        blocked = rng.random(n) < 0.3
+        for max_cost, orig_dur in ((50.0, 60.0), (0.0, 60.0), (1e9, 0.0)):
+            cases.append((costs, durs, blocked, max_cost, orig_dur))
+    cases.append((costs, durs, np.ones(len(costs), dtype=np.bool_), 1e9, 60.0))
+
+    for costs, durs, blocked, max_cost, orig_dur in cases:
+        got = _viable_swaps_jit(costs, durs, blocked, max_cost, orig_dur)
+        expected = _viable_swaps_np(costs, durs, blocked, max_cost, orig_dur)
+        assert got.tolist() == expected.tolist()
@@ -2,7 +2,19 @@
 Tests for candidate generator and rules hardening.
 """
 
-from app.engine.candidates import generate_candidates
+from app.engine.candidates import (
+    generate_candidates, haversine_km, load_all_pois, prefilter_by_themes_tags, window_by_region,
+    _poi_table, _prefilter_table,
+)
+
+# Drop reason prefixes; str.startswith checks the whole tuple in one call
+ALLOWED_DROP_REASONS = (
+    "avoid_tag:",
+    "bad_season",
+    "closed",
+    "precheck_transfer_exceeds",
+    "safety_gate",
+)
 
 BASE_REQ = {
     "trip_context": {
@@ -173,6 +185,31 @@ def test_opening_hours_filtering():
     assert "closed" in reasons or len(kept) < 20  # Either closed drops or fewer kept
 
 
+def test_precomputed_open_periods_match_opening_hours():
+    """Test that opening checks agree with and without the load-time minute intervals."""
+    from app.engine.candidates import opening_alignment
+    from app.engine.rules import is_open_for_day
+    
+    for day_slot in ({"start": "02:00", "end": "04:00"}, {"start": "08:30", "end": "20:00"}, {}):
+        for poi in load_all_pois()[:50]:
+            raw = {k: v for k, v in poi.items() if k != "_open_periods"}
+            assert is_open_for_day(poi, day_slot) == is_open_for_day(raw, day_slot)
+            assert opening_alignment(poi, day_slot) == opening_alignment(raw, day_slot)
+
+
+def test_precomputed_lower_tags_match_avoid_check():
+    """Test that avoid-tag matching agrees with and without the load-time lower-cased tags."""
+    from app.engine.rules import violates_avoid_tags
+    
+    pois = load_all_pois()
+    tags = sorted({t for p in pois for t in p["tags"]})
+    avoid_lists = [[t.upper()] for t in tags[:10]] + [[t[:3].lower()] for t in tags[:10]] + [["NoSuchTag"]]
+    for poi in pois[:50]:
+        raw = {k: v for k, v in poi.items() if k != "_tags_lower"}
+        for avoid in avoid_lists:
+            assert violates_avoid_tags(poi, avoid) == violates_avoid_tags(raw, avoid)
+
+
 def test_theme_prefiltering():
     """Test that theme prefiltering works."""
     # Use very specific themes that few POIs will match
@@ -192,6 +229,35 @@ def test_theme_prefiltering():
     assert len(kept) < 10
 
 
+def test_theme_prefilter_bitmasks_match_set_overlap():
+    """Test that the bitmask prefilter keeps the same POIs as the set-overlap one."""
+    pois = load_all_pois()
+    tags = sorted({t for p in pois for t in p["tags"]})
+    themes = sorted({t for p in pois for t in p["themes"]})
+    cases = [
+        {},
+        {"themes": themes[:1]},
+        {"activity_tags": tags[:2]},
+        {"themes": themes[-1:], "activity_tags": tags[-1:] + ["VerySpecificTag"]},
+        {"themes": ["VerySpecificTheme"]},
+    ]
+    for prefs in cases:
+        expected = prefilter_by_themes_tags(pois, prefs)
+        assert _prefilter_table(_poi_table(), prefs) == expected
+
+
+def test_region_window_matches_scalar_haversine():
+    """Test that the vectorized region window agrees with per-POI haversine_km."""
+    pois = load_all_pois()
+    base = (6.9271, 79.8612)
+    for radius_km in (5, 50, 300):
+        expected = [
+            p for p in pois
+            if haversine_km(base, (p["coords"]["lat"], p["coords"]["lng"])) <= radius_km
+        ]
+        assert window_by_region(pois, base, radius_km) == expected
+
+
 def test_safety_gate():
     """Test that safety gate filters out inappropriate activities."""
     # Use low energy preference to trigger safety gate
@@ -229,12 +295,4 @@ def test_drop_log_format():
         assert isinstance(drop["reason"], str)
         
         # Check that reason is from allowed list
-        allowed_reasons = {
-            "avoid_tag:",
-            "bad_season",
-            "closed", 
-            "precheck_transfer_exceeds",
-            "safety_gate"
-        }
-        reason = drop["reason"]
-        assert any(reason.startswith(prefix) or reason == prefix for prefix in allowed_reasons)
+        assert drop["reason"].startswith(ALLOWED_DROP_REASONS)
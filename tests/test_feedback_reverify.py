@@ -2,15 +2,11 @@
 Tests for feedback re-verification of changed edges.
 """
 
-from fastapi.testclient import TestClient
 from unittest.mock import patch
-from app.main import app
-
-client = TestClient(app)
 
 
 @patch("app.engine.transfers._call_google_routes")
-def test_feedback_only_reverifies_changed_edges(mock_google):
+def test_feedback_only_reverifies_changed_edges(mock_google, client):
     """Test that feedback only re-verifies changed edges."""
     req = {
         "trip_context": {
@@ -63,7 +59,7 @@ def test_feedback_only_reverifies_changed_edges(mock_google):
     assert mock_google.call_count <= 3  # Only adjacent edges reverified
 
 
-def test_feedback_handles_no_changes():
+def test_feedback_handles_no_changes(client):
     """Test that feedback handles requests with no changes."""
     req = {
         "trip_context": {
@@ -107,7 +103,7 @@ def test_feedback_handles_no_changes():
 
 
 @patch("app.engine.transfers._call_google_routes")
-def test_feedback_preserves_transfer_verification(mock_google):
+def test_feedback_preserves_transfer_verification(mock_google, client):
     """Test that feedback preserves transfer verification results."""
     mock_google.return_value = [{"minutes": 15, "km": 5.0}]
     
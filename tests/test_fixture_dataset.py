@@ -2,12 +2,18 @@
 Tests for fixture dataset to ensure it has the right diversity and demo data.
 """
 
+import pytest
 from app.dataset.fixtures import load_fixture_pois
 
 
-def test_fixture_has_minimum_diversity():
+@pytest.fixture(scope="module")
+def pois():
+    """The fixture dataset, parsed once for the module; tests only read it."""
+    return load_fixture_pois()
+
+
+def test_fixture_has_minimum_diversity(pois):
     """Test that fixture has minimum diversity for demos."""
-    pois = load_fixture_pois()
     assert len(pois) >= 12
     
     all_tags = {t for p in pois for t in p.get("tags", [])}
@@ -16,18 +22,15 @@ def test_fixture_has_minimum_diversity():
         assert needed in all_tags, f"Missing required tag: {needed}"
 
 
-def test_fixture_has_known_demo_ids():
+def test_fixture_has_known_demo_ids(pois):
     """Test that fixture contains the specific POIs needed for demos."""
-    pois = load_fixture_pois()
     ids = {p["poi_id"] for p in pois}
     required_ids = {"ella_rock_hike", "pettah_market_colombo", "nightlife_district_colombo"}
     assert required_ids <= ids, f"Missing required POI IDs: {required_ids - ids}"
 
 
-def test_fixture_pois_have_required_fields():
+def test_fixture_pois_have_required_fields(pois):
     """Test that all POIs have the required fields for reranking."""
-    pois = load_fixture_pois()
-    
     required_fields = ["poi_id", "tags", "name", "price_band", "estimated_cost", "duration_minutes"]
     
     for poi in pois:
@@ -44,10 +47,8 @@ def test_fixture_pois_have_required_fields():
         assert isinstance(poi["duration_minutes"], (int, float)), f"POI {poi['poi_id']} duration_minutes should be numeric"
 
 
-def test_fixture_has_demo_scenarios():
+def test_fixture_has_demo_scenarios(pois):
     """Test that fixture has the right combinations for demo scenarios."""
-    pois = load_fixture_pois()
-    
     # Find POIs for hiking/quiet demo
     hiking_quiet_pois = [p for p in pois if "hiking" in p["tags"] and "quiet" in p["tags"]]
     assert len(hiking_quiet_pois) >= 1, "Need at least one hiking/quiet POI for demo"
@@ -61,10 +62,8 @@ def test_fixture_has_demo_scenarios():
     assert len(street_food_pois) >= 1, "Need at least one street_food POI for demo"
 
 
-def test_fixture_has_price_diversity():
+def test_fixture_has_price_diversity(pois):
     """Test that fixture has diverse price bands for budget testing."""
-    pois = load_fixture_pois()
-    
     price_bands = {p["price_band"] for p in pois}
     expected_bands = {"free", "low", "medium", "high"}
     
@@ -76,10 +75,8 @@ def test_fixture_has_price_diversity():
     assert "low" in price_bands, "Need low-cost POIs for budget testing"
 
 
-def test_fixture_has_duration_diversity():
+def test_fixture_has_duration_diversity(pois):
     """Test that fixture has diverse durations for scheduling testing."""
-    pois = load_fixture_pois()
-    
     durations = [p["duration_minutes"] for p in pois]
     
     # Should have short, medium, and long activities
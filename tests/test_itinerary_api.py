@@ -1,17 +1,15 @@
 """Integration tests for the itinerary API endpoints."""
 
+import copy
+import json
 import pytest
-from fastapi.testclient import TestClient
 from datetime import date, time
-from app.main import app
 from app.dataset.loader import load_pois
 
-client = TestClient(app)
 
-
-@pytest.fixture(autouse=True)
+@pytest.fixture(scope="session", autouse=True)
 def setup_data():
-    """Load POIs before each test."""
+    """Load POIs once; every load reads the same bundled dataset."""
     load_pois()
 
 
@@ -23,7 +21,28 @@ def reset_rate_limit():
     yield
 
 
-def test_healthz_endpoint():
+@pytest.fixture(scope="module")
+def seed_itinerary(client):
+    """
+    Build the itineraries feedback tests start from, once per distinct request body.
+
+    Returns a function mapping a request body to the /v1/itinerary response
+    JSON; each call gets its own deep copy.
+    """
+    built = {}
+
+    def build(body):
+        key = json.dumps(body, sort_keys=True)
+        if key not in built:
+            response = client.post("/v1/itinerary", json=body)
+            assert response.status_code == 200
+            built[key] = response.json()
+        return copy.deepcopy(built[key])
+
+    return build
+
+
+def test_healthz_endpoint(client):
     """Test the health check endpoint."""
     response = client.get("/v1/healthz")
     
@@ -33,7 +52,7 @@ def test_healthz_endpoint():
     assert data["pois_loaded"] > 0
 
 
-def test_build_itinerary_success():
+def test_build_itinerary_success(client):
     """Test successful itinerary generation."""
     request_body = {
         "trip_context": {
@@ -79,7 +98,7 @@ def test_build_itinerary_success():
         assert has_transfer
 
 
-def test_build_itinerary_with_budget_constraint():
+def test_build_itinerary_with_budget_constraint(client):
     """Test itinerary generation respects budget constraints."""
     request_body = {
         "trip_context": {
@@ -104,7 +123,7 @@ def test_build_itinerary_with_budget_constraint():
     assert total_cost <= 50
 
 
-def test_feedback_remove_item():
+def test_feedback_remove_item(client, seed_itinerary):
     """Test feedback endpoint with remove_item action."""
     # First, build an initial itinerary
     initial_request = {
@@ -119,8 +138,7 @@ def test_feedback_remove_item():
         "locks": []
     }
     
-    initial_response = client.post("/v1/itinerary", json=initial_request)
-    initial_day = initial_response.json()["days"][0]
+    initial_day = seed_itinerary(initial_request)["days"][0]
     
     # Find an activity to remove
     activity_to_remove = None
@@ -162,7 +180,7 @@ def test_feedback_remove_item():
     assert activity_to_remove not in new_place_ids
 
 
-def test_build_itinerary_invalid_request():
+def test_build_itinerary_invalid_request(client):
     """Test that invalid requests return 422."""
     invalid_request = {
         "trip_context": {
@@ -175,7 +193,7 @@ def test_build_itinerary_invalid_request():
     assert response.status_code == 422
 
 
-def test_itinerary_respects_locks_and_budget():
+def test_itinerary_respects_locks_and_budget(client):
     """Test itinerary generation respects locks and budget constraints."""
     body = {
         "trip_context": {
@@ -195,7 +213,7 @@ def test_itinerary_respects_locks_and_budget():
     assert any(i.get("title") == "Lunch" for i in items)
 
 
-def test_feedback_remove_and_rate_bias():
+def test_feedback_remove_and_rate_bias(client, seed_itinerary):
     """Test feedback with remove_item and rate_item actions."""
     # First, build an initial itinerary
     seed_itinerary_body = {
@@ -210,11 +228,11 @@ def test_feedback_remove_and_rate_bias():
         "locks": []
     }
     
-    res = client.post("/v1/itinerary", json=seed_itinerary_body)
-    day = res.json()["days"][0]["date"]
+    seed_day = seed_itinerary(seed_itinerary_body)["days"][0]
+    day = seed_day["date"]
     
     # Pick an activity place_id from response
-    act = next(i for i in res.json()["days"][0]["items"] if i.get("type") != "transfer")
+    act = next(i for i in seed_day["items"] if i.get("type") != "transfer")
     
     fb = {
         "date": day,
@@ -238,7 +256,7 @@ def test_feedback_remove_and_rate_bias():
     assert act["place_id"] not in ids
 
 
-def test_locks_conflict_returns_409():
+def test_locks_conflict_returns_409(client):
     """Test that overlapping locks return 409 conflict."""
     body = {
         "trip_context": {
@@ -264,7 +282,7 @@ def test_locks_conflict_returns_409():
     assert "Lock time windows overlap" in error_data["error"]["message"]
 
 
-def test_validation_limits_items_per_day():
+def test_validation_limits_items_per_day(client):
     """Test that each day respects MAX_ITEMS_PER_DAY limit."""
     # This test might need adjustment based on actual POI data
     request_body = {
@@ -289,7 +307,7 @@ def test_validation_limits_items_per_day():
             assert len(non_transfer_items) <= 4  # MAX_ITEMS_PER_DAY default
 
 
-def test_feedback_preserves_locks():
+def test_feedback_preserves_locks(client, seed_itinerary):
     """Test that feedback repack preserves existing locks."""
     # Create a day with a lock
     itinerary_request = {
@@ -311,9 +329,7 @@ def test_feedback_preserves_locks():
         ]
     }
     
-    itinerary_response = client.post("/v1/itinerary", json=itinerary_request)
-    assert itinerary_response.status_code == 200
-    itinerary_data = itinerary_response.json()
+    itinerary_data = seed_itinerary(itinerary_request)
     
     # Test feedback that should preserve the lock
     feedback_request = {
@@ -355,7 +371,7 @@ def test_feedback_preserves_locks():
     assert lock_item["title"] == "Reserved Lunch"
 
 
-def test_response_notes_on_heuristic_fallback():
+def test_response_notes_on_heuristic_fallback(client):
     """Test that response includes notes when heuristic fallback is used."""
     request_body = {
         "trip_context": {
@@ -381,7 +397,7 @@ def test_response_notes_on_heuristic_fallback():
         assert any("heuristic" in note.lower() for note in data["notes"])
 
 
-def test_currency_conversion():
+def test_currency_conversion(client):
     """Test that currency conversion works correctly."""
     request_body = {
         "trip_context": {
@@ -411,7 +427,7 @@ def test_currency_conversion():
     assert data["totals"]["trip_cost_est"] is not None
 
 
-def test_structured_error_format():
+def test_structured_error_format(client):
     """Test that errors follow consistent structured format."""
     # Test with invalid date range (should trigger 422)
     request_body = {
@@ -439,7 +455,7 @@ def test_structured_error_format():
     assert "hints" in data["error"]
 
 
-def test_feedback_notes():
+def test_feedback_notes(client, seed_itinerary):
     """Test that feedback responses include notes about changes."""
     # Create a day with a lock
     itinerary_request = {
@@ -461,9 +477,7 @@ def test_feedback_notes():
         ]
     }
     
-    itinerary_response = client.post("/v1/itinerary", json=itinerary_request)
-    assert itinerary_response.status_code == 200
-    itinerary_data = itinerary_response.json()
+    itinerary_data = seed_itinerary(itinerary_request)
     
     # Test feedback that removes an item
     feedback_request = {
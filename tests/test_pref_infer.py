@@ -0,0 +1,59 @@
+"""
+Tests for batch preference inference from exported weights.
+"""
+
+import json
+import os
+import numpy as np
+import joblib
+from app.models.pref_infer import WEIGHTS_PATH, load_weights, score_batch
+
+MODELS_DIR = os.path.dirname(WEIGHTS_PATH)
+
+
+def _random_features(n_rows=25):
+    rng = np.random.default_rng(0)
+    X = np.zeros((n_rows, 38), dtype=np.float32)
+    X[:, :34] = rng.integers(0, 2, size=(n_rows, 34))
+    X[:, 34] = rng.uniform(0, 200, n_rows)
+    X[:, 35] = rng.uniform(30, 300, n_rows)
+    X[:, 36] = rng.uniform(0, 1, n_rows)
+    X[:, 37] = rng.exponential(5, n_rows)
+    return X
+
+
+def test_score_batch_shape_and_range():
+    """Test that batch scoring returns one probability per row."""
+    scores = score_batch(_random_features())
+
+    assert scores.shape == (25,)
+    assert np.all((scores >= 0.0) & (scores <= 1.0))
+
+
+def test_score_batch_matches_pipeline():
+    """Test that exported weights reproduce the sklearn pipeline's probabilities."""
+    X = _random_features()
+    model = joblib.load(os.path.join(MODELS_DIR, "pref_lr_v1.joblib"))
+
+    expected = model.predict_proba(X.astype(np.float64))[:, 1]
+    scores = score_batch(X, load_weights(WEIGHTS_PATH))
+
+    assert np.allclose(scores, expected, atol=1e-5)
+
+
+def test_score_batch_single_row():
+    """Test that scoring one row matches scoring it within a batch."""
+    X = _random_features()
+
+    assert np.isclose(score_batch(X[3:4])[0], score_batch(X)[3])
+
+
+def test_weights_carry_feature_order():
+    """Test that exported weights record the training feature order."""
+    weights = load_weights(WEIGHTS_PATH)
+    with open(os.path.join(MODELS_DIR, "pref_lr_v1.metadata.json")) as f:
+        metadata = json.load(f)
+
+    assert weights["feature_names"].tolist() == metadata["feature_names"]
+    assert len(weights["feature_names"]) == weights["w"].shape[0]
+    assert weights["feature_index"]["price_free"] == metadata["feature_names"].index("price_free")
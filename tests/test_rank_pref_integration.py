@@ -3,7 +3,7 @@ Integration tests for rank module with preference scoring.
 """
 
 import pytest
-from app.engine.rank import rank, _calculate_pref_fit
+from app.engine.rank import rank, _calculate_pref_fit, _score
 from app.engine.ml_pref import get_preference_scorer
 
 
@@ -155,3 +155,47 @@ def test_rank_with_affinities():
     
     assert len(ranked) == 2
     assert "pref_model_version" in metrics
+
+
+def test_rank_orders_by_score():
+    """Test that rank orders candidates as the per-candidate _score would."""
+    candidates = [
+        {"poi_id": f"p{i}", "tags": tags, "themes": ["Culture"], "estimated_cost": cost, "duration_minutes": dur}
+        for i, (tags, cost, dur) in enumerate([
+            (["culture"], 10, 90), (["hiking"], 150, 240), (["museum"], 60, 45),
+            (["nature"], 0, None), (["culture"], 10, 90), (["market"], 95, 200),
+        ])
+    ]
+    preferences = {"themes": ["Culture"], "activity_tags": [], "avoid_tags": []}
+    context = {"day_template": {"pace": "moderate"}}
+    
+    for daily_cap in (None, 100):
+        ranked, metrics = rank(candidates, daily_cap, preferences, context=context)
+        scores = {c["poi_id"]: _score(c, daily_cap, preferences, "08:30", "20:00", "moderate", [], None, context)
+                  for c in candidates}
+        # Stable: tied scores keep input order
+        expected = sorted(candidates, key=lambda c: scores[c["poi_id"]], reverse=True)
+        assert [c["poi_id"] for c in ranked] == [c["poi_id"] for c in expected]
+
+
+def test_time_budget_fits_jit_matches_numpy():
+    """Test that the numba fit kernel returns exactly the numpy fit scores."""
+    pytest.importorskip("numba")
+    import numpy as np
+    from app.engine.rank import _time_budget_fits_jit, _time_budget_fits_np
+
+    day_length = 690.0
+    # 60/180 band edges, and durations past the day length
+    durations = np.array([0, 30, 59, 60, 61, 179, 180, 181, 689, 690, 691, 1000], dtype=np.float64)
+    for daily_cap in (0.0, 100.0, 150.0, 0.3):
+        # Costs landing on, just inside and just outside the 0.2/0.8 ratio edges, and over the cap
+        edges = np.array([0.2 * daily_cap, 0.8 * daily_cap])
+        costs = np.concatenate([
+            [0.0, daily_cap, daily_cap + 1.0],
+            edges, np.nextafter(edges, 0.0), np.nextafter(edges, np.inf),
+        ])
+        costs = np.resize(costs, durations.shape[0])
+        got = _time_budget_fits_jit(costs, durations, daily_cap, day_length)
+        expected = _time_budget_fits_np(costs, durations, daily_cap, day_length)
+        for g, e in zip(got, expected):
+            assert g.tolist() == e.tolist()
@@ -2,12 +2,8 @@
 Tests using fixture dataset to demonstrate reranker functionality.
 """
 
-from fastapi.testclient import TestClient
-from app.main import app
 from app.dataset.fixtures import load_fixture_pois
 
-client = TestClient(app)
-
 
 def pick(ids, pois):
     """Helper to pick specific POIs by ID from the fixture data."""
@@ -15,7 +11,7 @@ def pick(ids, pois):
     return [poi_map[i] for i in ids]
 
 
-def test_rerank_fixture_demo_boosts_hiking_penalizes_nightlife():
+def test_rerank_fixture_demo_boosts_hiking_penalizes_nightlife(client):
     """Test that reranker boosts hiking/quiet POIs and penalizes nightlife/crowded POIs."""
     pois = load_fixture_pois()
     
@@ -71,7 +67,7 @@ def test_rerank_fixture_demo_boosts_hiking_penalizes_nightlife():
     assert nightlife_score < 0.60, f"Nightlife should be penalized below 0.60, got {nightlife_score}"
 
 
-def test_rerank_fixture_with_reasons():
+def test_rerank_fixture_with_reasons(client):
     """Test that reranker provides clear reasons for reranking decisions."""
     pois = load_fixture_pois()
     
@@ -120,7 +116,7 @@ def test_rerank_fixture_with_reasons():
                     assert "nightlife" in reason.lower() or "crowded" in reason.lower(), f"Nightlife reason should mention nightlife/crowded: {reason}"
 
 
-def test_rerank_fixture_mixed_feedback():
+def test_rerank_fixture_mixed_feedback(client):
     """Test reranking with mixed positive and negative feedback."""
     pois = load_fixture_pois()
     
@@ -185,7 +181,7 @@ def test_rerank_fixture_mixed_feedback():
     assert museum_position < len(order) - 1, "Museum should not be last"
 
 
-def test_rerank_fixture_deterministic():
+def test_rerank_fixture_deterministic(client):
     """Test that reranking with fixture data is deterministic."""
     pois = load_fixture_pois()
     cands = pick(["ella_rock_hike", "nightlife_district_colombo", "pettah_market_colombo"], pois)
@@ -212,9 +208,11 @@ def test_rerank_fixture_deterministic():
         }
     }
     
-    # Run multiple times
+    # Run multiple times, clearing the response cache so each run reranks afresh
+    from app.api.rerank import _rerank_cache
     results = []
     for _ in range(3):
+        _rerank_cache.clear()
         response = client.post("/v1/rerank", json=payload)
         assert response.status_code == 200
         results.append(response.json()["reranked"])
@@ -224,7 +222,7 @@ def test_rerank_fixture_deterministic():
         assert results[i] == results[0], f"Reranking should be deterministic, got different results"
 
 
-def test_rerank_fixture_metadata():
+def test_rerank_fixture_metadata(client):
     """Test that reranking metadata is correctly populated."""
     pois = load_fixture_pois()
     cands = pick(["ella_rock_hike", "nightlife_district_colombo"], pois)
@@ -4,12 +4,8 @@ Tests for share tokens and admin endpoints.
 import pytest
 import time
 from unittest.mock import patch
-from fastapi.testclient import TestClient
-from app.main import app
 from app.share.store import create_share_token, get_share_data, get_store_stats
 
-client = TestClient(app)
-
 
 class TestShareTokens:
     """Test share token functionality."""
@@ -71,7 +67,7 @@ class TestShareTokens:
 class TestAdminEndpoints:
     """Test admin POI endpoints."""
     
-    def test_admin_endpoints_require_key(self):
+    def test_admin_endpoints_require_key(self, client):
         """Test that admin endpoints require admin key."""
         # Test without key
         response = client.get("/admin/pois")
@@ -80,7 +76,7 @@ class TestAdminEndpoints:
         response = client.post("/admin/pois", json={"poi_id": "test"})
         assert response.status_code == 403  # Admin disabled by default
     
-    def test_admin_endpoints_disabled(self):
+    def test_admin_endpoints_disabled(self, client):
         """Test admin endpoints when disabled."""
         with patch('app.config.get_settings') as mock_settings:
             mock_settings.return_value.ADMIN_API_KEY = None
@@ -88,7 +84,7 @@ class TestAdminEndpoints:
             response = client.get("/admin/pois", headers={"x-admin-key": "any-key"})
             assert response.status_code == 403
     
-    def test_list_pois(self):
+    def test_list_pois(self, client):
         """Test listing POIs."""
         with patch('app.config.get_settings') as mock_settings:
             mock_settings.return_value.ADMIN_API_KEY = "test-admin-key"
@@ -102,7 +98,7 @@ class TestAdminEndpoints:
             assert data["pagination"]["page"] == 1
             assert data["pagination"]["limit"] == 50
     
-    def test_create_poi(self):
+    def test_create_poi(self, client):
         """Test creating a POI."""
         with patch('app.config.get_settings') as mock_settings:
             mock_settings.return_value.ADMIN_API_KEY = "test-admin-key"
@@ -129,7 +125,7 @@ class TestAdminEndpoints:
             assert data["message"] == "POI created successfully"
             assert data["poi"]["poi_id"] == "test_poi_1"
     
-    def test_create_poi_duplicate(self):
+    def test_create_poi_duplicate(self, client):
         """Test creating a duplicate POI."""
         with patch('app.config.get_settings') as mock_settings:
             mock_settings.return_value.ADMIN_API_KEY = "test-admin-key"
@@ -157,7 +153,7 @@ class TestAdminEndpoints:
             response2 = client.post("/admin/pois", json=poi_data, headers={"x-admin-key": "test-admin-key"})
             assert response2.status_code == 409
     
-    def test_update_poi(self):
+    def test_update_poi(self, client):
         """Test updating a POI."""
         with patch('app.config.get_settings') as mock_settings:
             mock_settings.return_value.ADMIN_API_KEY = "test-admin-key"
@@ -195,7 +191,7 @@ class TestAdminEndpoints:
             assert data["poi"]["name"] == "Updated Name"
             assert data["poi"]["estimated_cost"] == 50
     
-    def test_update_poi_not_found(self):
+    def test_update_poi_not_found(self, client):
         """Test updating a non-existent POI."""
         with patch('app.config.get_settings') as mock_settings:
             mock_settings.return_value.ADMIN_API_KEY = "test-admin-key"
@@ -205,7 +201,7 @@ class TestAdminEndpoints:
             response = client.patch("/admin/pois/nonexistent", json=update_data, headers={"x-admin-key": "test-admin-key"})
             assert response.status_code == 404
     
-    def test_delete_poi(self):
+    def test_delete_poi(self, client):
         """Test deleting a POI."""
         with patch('app.config.get_settings') as mock_settings:
             mock_settings.return_value.ADMIN_API_KEY = "test-admin-key"
@@ -237,7 +233,7 @@ class TestAdminEndpoints:
             assert data["message"] == "POI deleted successfully"
             assert data["deleted_poi"]["poi_id"] == "delete_poi"
     
-    def test_delete_poi_not_found(self):
+    def test_delete_poi_not_found(self, client):
         """Test deleting a non-existent POI."""
         with patch('app.config.get_settings') as mock_settings:
             mock_settings.return_value.ADMIN_API_KEY = "test-admin-key"
@@ -245,7 +241,7 @@ class TestAdminEndpoints:
             response = client.delete("/admin/pois/nonexistent", headers={"x-admin-key": "test-admin-key"})
             assert response.status_code == 404
     
-    def test_get_poi(self):
+    def test_get_poi(self, client):
         """Test getting a specific POI."""
         with patch('app.config.get_settings') as mock_settings:
             mock_settings.return_value.ADMIN_API_KEY = "test-admin-key"
@@ -277,7 +273,7 @@ class TestAdminEndpoints:
             assert data["poi"]["poi_id"] == "get_poi"
             assert data["poi"]["name"] == "Get POI"
     
-    def test_get_poi_not_found(self):
+    def test_get_poi_not_found(self, client):
         """Test getting a non-existent POI."""
         with patch('app.config.get_settings') as mock_settings:
             mock_settings.return_value.ADMIN_API_KEY = "test-admin-key"